@@ -1,6 +1,8 @@
 from .condition import Condition
+from .grid import Grid, SparseGrid
 from .main import Constructor
 from .principle import Principle
+from .rule import RuleTable
 from .substrate import Substrate
 from .system import System
 from .task import Task
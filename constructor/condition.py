@@ -7,7 +7,9 @@ the properties of the environment, or other factors. They play a crucial role in
 defining the feasibility of transformations within a physical system.
 """
 
-from typing import TYPE_CHECKING, Callable
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Awaitable, Callable, Union
 
 if TYPE_CHECKING:
     from constructor.substrate import Substrate
@@ -23,15 +25,20 @@ class Condition:
         Name of the condition.
     check_function: Callable[[Substrate], bool]
         A function that returns True if the condition is met, False otherwise.
+        May be a coroutine function when the condition is awaited with acheck.
 
     Methods
     -------
     check(substrate: Substrate) -> bool
         Check the condition against a substrate.
+    acheck(substrate: Substrate) -> bool
+        Asynchronously check the condition against a substrate.
     """
 
     def __init__(
-        self, name: str, check_function: Callable[["Substrate"], bool]
+        self,
+        name: str,
+        check_function: Callable[["Substrate"], Union[bool, Awaitable[bool]]],
     ) -> None:
         """
         Initialize a Condition.
@@ -50,6 +57,9 @@ class Condition:
         """
         Check the condition against a substrate.
 
+        Coroutine check functions can't be checked synchronously; use
+        ``acheck`` for them.
+
         Parameters
         ----------
         substrate: Substrate
@@ -60,4 +70,28 @@ class Condition:
         bool
             True if the condition is met, False otherwise.
         """
+        if inspect.iscoroutinefunction(self.check_function):
+            raise TypeError(f"{self.name} has an async check function; use acheck")
         return self.check_function(substrate)
+
+    async def acheck(self, substrate: "Substrate") -> bool:
+        """
+        Asynchronously check the condition against a substrate.
+
+        Coroutine check functions are awaited directly. Synchronous check
+        functions run in the default thread executor so they do not block
+        the event loop.
+
+        Parameters
+        ----------
+        substrate: Substrate
+            The substrate to check.
+
+        Returns
+        -------
+        bool
+            True if the condition is met, False otherwise.
+        """
+        if inspect.iscoroutinefunction(self.check_function):
+            return await self.check_function(substrate)
+        return await asyncio.to_thread(self.check_function, substrate)
@@ -0,0 +1,260 @@
+"""
+A distributed grid splits a large two-state lattice into horizontal strips,
+one per worker process, so every core steps its own part of the grid.
+
+Both the current and next generation live in shared memory with a one-cell
+dead border. Each generation a worker reads its strip plus the one-row halos
+owned by its neighbors straight from the shared buffer, writes its strip of
+the next generation, and waits at a barrier until every worker is done before
+the buffers swap. No cell data is copied between processes.
+"""
+
+import multiprocessing as mp
+import threading
+from multiprocessing.connection import wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from constructor.rule import RuleTable
+
+if TYPE_CHECKING:
+    from constructor.grid import Grid
+    from constructor.task import Task
+
+
+def _step_rows(
+    current: np.ndarray, following: np.ndarray, start: int, stop: int, table: np.ndarray
+) -> None:
+    """
+    Write rows ``start:stop`` of the next generation of a bordered buffer.
+    """
+    block = current[start - 1 : stop + 1]
+    counts = (
+        block[:-2, :-2] + block[:-2, 1:-1] + block[:-2, 2:]
+        + block[1:-1, :-2] + block[1:-1, 2:]
+        + block[2:, :-2] + block[2:, 1:-1] + block[2:, 2:]
+    )
+    following[start:stop, 1:-1] = table[block[1:-1, 1:-1], counts]
+
+
+def _worker(name: str, shape: Tuple[int, int], start: int, stop: int, barrier, conn) -> None:
+    shm = SharedMemory(name=name)
+    buffers = np.ndarray((2,) + shape, dtype=np.uint8, buffer=shm.buf)
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            table, current, generations = message
+            for _ in range(generations):
+                _step_rows(buffers[current], buffers[1 - current], start, stop, table)
+                barrier.wait()
+                current = 1 - current
+            conn.send(True)
+    except (threading.BrokenBarrierError, EOFError, OSError):
+        # Another worker or the parent died; the grid is being torn down
+        pass
+    finally:
+        del buffers
+        shm.close()
+
+
+class DistributedGrid:
+    """
+    A bounded two-state grid stepped in parallel by worker processes.
+
+    Cells are stored as 0 (dead) or 1 (alive). Rule tasks use the same
+    ``execute(cell, neighbors)`` interface as ``Grid`` and must be Life-like;
+    they are compiled to an outer-totalistic ``RuleTable`` once and applied to
+    whole strips with numpy. A two-state Moore RuleTable can be passed
+    directly.
+
+    Attributes
+    ----------
+    rows: int
+        Number of rows.
+    cols: int
+        Number of columns.
+    workers: int
+        Number of worker processes.
+    alive: str
+        The alive state.
+    dead: str
+        The dead state.
+
+    Methods
+    -------
+    from_grid(grid: Grid, workers: int, alive: str, dead: str) -> DistributedGrid
+        Create a distributed grid from a dense grid of cells.
+    array() -> np.ndarray
+        Get the current generation as a 0/1 array.
+    step(task: Task, generations: int = 1) -> None
+        Apply a rule task to the grid for a number of generations.
+    close() -> None
+        Stop the workers and release the shared memory.
+    """
+
+    def __init__(
+        self,
+        array: np.ndarray,
+        workers: int = None,
+        alive: str = "alive",
+        dead: str = "dead",
+    ) -> None:
+        """
+        Initialize a DistributedGrid and start its workers.
+
+        Parameters
+        ----------
+        array: np.ndarray
+            2D array of the initial generation, nonzero for alive cells.
+        workers: int
+            Number of worker processes. Defaults to the number of CPUs,
+            capped at the number of rows.
+        alive: str
+            The alive state.
+        dead: str
+            The dead state.
+        """
+        self.rows, self.cols = array.shape
+        self.workers = min(workers or mp.cpu_count(), self.rows)
+        self.alive = alive
+        self.dead = dead
+        self._tables: Dict["Task", np.ndarray] = {}
+        self._current = 0
+
+        shape = (self.rows + 2, self.cols + 2)
+        self._shm = SharedMemory(create=True, size=2 * shape[0] * shape[1])
+        self._buffers = np.ndarray((2,) + shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._buffers[:] = 0
+        self._buffers[0, 1:-1, 1:-1] = array != 0
+
+        self._barrier = mp.Barrier(self.workers)
+        bounds = np.linspace(1, self.rows + 1, self.workers + 1).astype(int)
+        self._processes: List[mp.Process] = []
+        self._connections = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = mp.Pipe()
+            process = mp.Process(
+                target=_worker,
+                args=(self._shm.name, shape, int(start), int(stop), self._barrier, child),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+            self._connections.append(parent)
+
+    @classmethod
+    def from_grid(
+        cls, grid: "Grid", workers: int = None, alive: str = "alive", dead: str = "dead"
+    ) -> "DistributedGrid":
+        """
+        Create a distributed grid from a dense grid of cells.
+
+        Parameters
+        ----------
+        grid: Grid
+            The grid to copy.
+        workers: int
+            Number of worker processes.
+        alive: str
+            The alive state.
+        dead: str
+            The dead state.
+
+        Returns
+        -------
+        DistributedGrid
+            The new distributed grid.
+        """
+        array = np.array([[cell.state == alive for cell in row] for row in grid.cells])
+        return cls(array, workers=workers, alive=alive, dead=dead)
+
+    def __enter__(self) -> "DistributedGrid":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def array(self) -> np.ndarray:
+        """
+        Get the current generation as a 0/1 array.
+
+        Returns
+        -------
+        np.ndarray
+            A copy of the current generation.
+        """
+        return self._buffers[self._current, 1:-1, 1:-1].copy()
+
+    def step(self, task: "Task", generations: int = 1) -> None:
+        """
+        Apply a rule task to the grid for a number of generations.
+
+        Parameters
+        ----------
+        task: Task
+            The Life-like rule task to apply.
+        generations: int
+            Number of generations to advance.
+        """
+        if generations <= 0:
+            return
+        table = self._table(task)
+        try:
+            for connection in self._connections:
+                connection.send((table, self._current, generations))
+            pending = dict(zip(self._connections, self._processes))
+            while pending:
+                ready = wait(list(pending) + [p.sentinel for p in pending.values()])
+                for connection in [c for c in pending if c in ready]:
+                    connection.recv()
+                    del pending[connection]
+                if any(p.sentinel in ready for p in pending.values()):
+                    raise EOFError
+        except (EOFError, OSError):
+            # Release the workers still waiting at the barrier
+            self._barrier.abort()
+            raise RuntimeError("a worker process died") from None
+        self._current = (self._current + generations) % 2
+
+    def close(self) -> None:
+        """
+        Stop the workers and release the shared memory.
+
+        Workers that do not exit are terminated. The shared memory is always
+        released, even if a worker died.
+        """
+        if self._shm is None:
+            return
+        try:
+            for connection in self._connections:
+                try:
+                    connection.send(None)
+                except (EOFError, OSError):
+                    pass
+            self._barrier.abort()
+            for process in self._processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        finally:
+            del self._buffers
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def _table(self, task: "Task") -> np.ndarray:
+        table = self._tables.get(task)
+        if table is None:
+            rule = task
+            if not isinstance(rule, RuleTable):
+                rule = RuleTable.compile(task, [self.dead, self.alive])
+            if rule.neighborhood != "moore" or rule.states != [self.dead, self.alive]:
+                raise ValueError(f"{task.name} is not a two-state Moore rule")
+            table = rule.outer_totalistic_table().astype(np.uint8)
+            self._tables[task] = table
+        return table
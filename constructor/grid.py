@@ -0,0 +1,441 @@
+"""
+A grid is a two-dimensional lattice of substrates (cells) on which a rule task
+is applied to every cell at once, as in cellular automata.
+
+Each generation, the rule task is given a cell and its neighboring cells and
+returns the cell's next state. All next states are computed before any are
+applied, so the update is synchronous.
+
+``Grid`` stores every cell densely and is bounded; cells outside it are in a
+background state. ``SparseGrid`` is unbounded and only stores cells that
+differ from a default (background) state. On both, a rule task is always
+given the neighbors in the fixed order of ``MOORE``.
+"""
+
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from constructor.rule import MOORE, RuleTable
+from constructor.substrate import Substrate
+
+if TYPE_CHECKING:
+    from constructor.task import Task
+
+
+class Grid:
+    """
+    A bounded two-dimensional grid of cells.
+
+    Attributes
+    ----------
+    cells: List[List[Substrate]]
+        The cells of the grid, indexed by row then column.
+    rows: int
+        Number of rows.
+    cols: int
+        Number of columns.
+    background: str
+        The state of the cells outside the grid.
+    dirty: Dict[Tuple[int, int], None]
+        Ordered set of cell positions to evaluate on the next incremental step.
+
+    Methods
+    -------
+    filled(rows: int, cols: int, state: str, cell_factory: Callable, background: str) -> Grid
+        Create a grid with every cell in the same state.
+    random(rows: int, cols: int, fraction: float, rng: np.random.Generator) -> Grid
+        Create a grid with a random fraction of alive cells.
+    neighbors(row: int, col: int) -> List[Substrate]
+        Get the neighboring cells of a cell.
+    set_state(row: int, col: int, state: str) -> None
+        Set the state of a cell and schedule it for the next incremental step.
+    mark_dirty(row: int, col: int) -> None
+        Schedule a cell and its neighbors for the next incremental step.
+    step(task: Task, incremental: bool = False) -> List[Tuple[int, int]]
+        Apply a rule task to the grid for one generation.
+    """
+
+    def __init__(self, cells: List[List["Substrate"]], background: str = "dead") -> None:
+        """
+        Initialize a Grid.
+
+        Parameters
+        ----------
+        cells: List[List[Substrate]]
+            The cells of the grid, indexed by row then column.
+        background: str
+            The state of the cells outside the grid.
+        """
+        self.cells = cells
+        self.rows = len(cells)
+        self.cols = len(cells[0]) if cells else 0
+        self.background = background
+        self._outside = Substrate(background, "Cell")
+        self.dirty: Dict[Tuple[int, int], None] = dict.fromkeys(
+            (i, j) for i in range(self.rows) for j in range(self.cols)
+        )
+
+    @classmethod
+    def filled(
+        cls,
+        rows: int,
+        cols: int,
+        state: str,
+        cell_factory: Callable[[str], "Substrate"] = None,
+        background: str = None,
+    ) -> "Grid":
+        """
+        Create a grid with every cell in the same state.
+
+        Parameters
+        ----------
+        rows: int
+            Number of rows.
+        cols: int
+            Number of columns.
+        state: str
+            The initial state of every cell.
+        cell_factory: Callable[[str], Substrate]
+            Function creating a cell from a state. Defaults to a Substrate
+            named "Cell".
+        background: str
+            The state of the cells outside the grid. Defaults to ``state``.
+
+        Returns
+        -------
+        Grid
+            The new grid.
+        """
+        if cell_factory is None:
+            cell_factory = lambda s: Substrate(s, "Cell")
+        cells = [[cell_factory(state) for _ in range(cols)] for _ in range(rows)]
+        return cls(cells, state if background is None else background)
+
+    @classmethod
+    def random(
+        cls,
+        rows: int,
+        cols: int,
+        fraction: float,
+        rng: np.random.Generator,
+        alive: str = "alive",
+        dead: str = "dead",
+        cell_factory: Callable[[str], "Substrate"] = None,
+    ) -> "Grid":
+        """
+        Create a grid with a random fraction of alive cells.
+
+        All random numbers are drawn from ``rng`` in a single call.
+
+        Parameters
+        ----------
+        rows: int
+            Number of rows.
+        cols: int
+            Number of columns.
+        fraction: float
+            Probability of each cell being alive.
+        rng: np.random.Generator
+            The random stream, e.g. from ``RandomStreams.stream``.
+        alive: str
+            The alive state.
+        dead: str
+            The dead state, also the state of the cells outside the grid.
+        cell_factory: Callable[[str], Substrate]
+            Function creating a cell from a state. Defaults to a Substrate
+            named "Cell".
+
+        Returns
+        -------
+        Grid
+            The new grid.
+        """
+        if cell_factory is None:
+            cell_factory = lambda s: Substrate(s, "Cell")
+        mask = rng.random((rows, cols)) < fraction
+        return cls([[cell_factory(alive if m else dead) for m in row] for row in mask], dead)
+
+    def neighbors(self, row: int, col: int) -> List["Substrate"]:
+        """
+        Get the neighboring cells of a cell.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+
+        Returns
+        -------
+        List[Substrate]
+            The eight neighboring cells in the order of ``MOORE``. Positions
+            outside the grid are a shared, read-only cell in the background
+            state.
+        """
+        return [
+            self.cells[row + i][col + j]
+            if 0 <= row + i < self.rows and 0 <= col + j < self.cols
+            else self._outside
+            for i, j in MOORE
+        ]
+
+    def set_state(self, row: int, col: int, state: str) -> None:
+        """
+        Set the state of a cell and schedule it for the next incremental step.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+        state: str
+            The new state of the cell.
+        """
+        self.cells[row][col].state = state
+        self.mark_dirty(row, col)
+
+    def mark_dirty(self, row: int, col: int) -> None:
+        """
+        Schedule a cell and its neighbors for the next incremental step.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+        """
+        self.dirty[(row, col)] = None
+        self.dirty.update(dict.fromkeys(self._neighbor_positions(row, col)))
+
+    def step(self, task: "Task", incremental: bool = False) -> List[Tuple[int, int]]:
+        """
+        Apply a rule task to the grid for one generation.
+
+        The task's ``execute(cell, neighbors)`` must return the next state of
+        the cell and depend only on the cell and its neighbors, given as by
+        ``neighbors``. A RuleTable is applied to the whole grid at once with a
+        table lookup instead; both treat cells outside the grid as being in
+        the background state, so a task and its compiled table agree.
+
+        Parameters
+        ----------
+        task: Task
+            The rule task to apply.
+        incremental: bool
+            If True, only evaluate cells whose state or neighbors changed in
+            the previous step (or were marked dirty). Otherwise evaluate every
+            cell. Ignored for RuleTables.
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            Positions of the cells whose state changed.
+        """
+        if isinstance(task, RuleTable):
+            return self._step_table(task)
+
+        if incremental:
+            positions = list(self.dirty)
+        else:
+            positions = [(i, j) for i in range(self.rows) for j in range(self.cols)]
+        self.dirty = {}
+
+        updates = []
+        for row, col in positions:
+            cell = self.cells[row][col]
+            new_state = task.execute(cell, self.neighbors(row, col))
+            if new_state != cell.state:
+                updates.append((row, col, new_state))
+
+        changed = []
+        for row, col, new_state in updates:
+            self.cells[row][col].state = new_state
+            self.mark_dirty(row, col)
+            changed.append((row, col))
+
+        return changed
+
+    def _step_table(self, rule: RuleTable) -> List[Tuple[int, int]]:
+        if self.background not in rule.index:
+            raise ValueError(f"background {self.background!r} is not a state of {rule.name}")
+        codes = np.array([[rule.index[cell.state] for cell in row] for row in self.cells])
+        following = rule.apply(codes, background=rule.index[self.background])
+        self.dirty = {}
+        changed = []
+        for row, col in zip(*np.nonzero(following != codes)):
+            row, col = int(row), int(col)
+            self.cells[row][col].state = rule.states[following[row, col]]
+            self.mark_dirty(row, col)
+            changed.append((row, col))
+        return changed
+
+    def _neighbor_positions(self, row: int, col: int) -> List[Tuple[int, int]]:
+        return [
+            (row + i, col + j)
+            for i, j in MOORE
+            if 0 <= row + i < self.rows and 0 <= col + j < self.cols
+        ]
+
+
+class SparseGrid:
+    """
+    An unbounded two-dimensional grid that only stores non-default cells.
+
+    Rule tasks are evaluated only on stored cells and their neighbors, so the
+    rule must leave a default cell surrounded by default cells unchanged.
+    Cells handed to the rule are shared, read-only views; the rule must not
+    modify them.
+
+    Attributes
+    ----------
+    default: str
+        The background state of every cell that is not stored.
+    cells: Dict[Tuple[int, int], str]
+        States of the non-default cells, keyed by (row, col).
+
+    Methods
+    -------
+    get_state(row: int, col: int) -> str
+        Get the state of a cell.
+    set_state(row: int, col: int, state: str) -> None
+        Set the state of a cell.
+    neighbors(row: int, col: int) -> List[Substrate]
+        Get the neighboring cells of a cell.
+    bounds() -> Tuple[int, int, int, int]
+        Get the bounding box of the non-default cells.
+    step(task: Task) -> List[Tuple[int, int]]
+        Apply a rule task to the grid for one generation.
+    """
+
+    def __init__(self, default: str = "dead", cells: Dict[Tuple[int, int], str] = None) -> None:
+        """
+        Initialize a SparseGrid.
+
+        Parameters
+        ----------
+        default: str
+            The background state of every cell that is not stored.
+        cells: Dict[Tuple[int, int], str]
+            Optional initial states keyed by (row, col).
+        """
+        self.default = default
+        self.cells: Dict[Tuple[int, int], str] = {}
+        self._views: Dict[str, "Substrate"] = {}
+        for (row, col), state in (cells or {}).items():
+            self.set_state(row, col, state)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def get_state(self, row: int, col: int) -> str:
+        """
+        Get the state of a cell.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+
+        Returns
+        -------
+        str
+            The state of the cell.
+        """
+        return self.cells.get((row, col), self.default)
+
+    def set_state(self, row: int, col: int, state: str) -> None:
+        """
+        Set the state of a cell.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+        state: str
+            The new state of the cell.
+        """
+        if state == self.default:
+            self.cells.pop((row, col), None)
+        else:
+            self.cells[(row, col)] = state
+
+    def neighbors(self, row: int, col: int) -> List["Substrate"]:
+        """
+        Get the neighboring cells of a cell.
+
+        Parameters
+        ----------
+        row: int
+            Row index of the cell.
+        col: int
+            Column index of the cell.
+
+        Returns
+        -------
+        List[Substrate]
+            Read-only views of the eight neighboring cells.
+        """
+        return [self._view(self.get_state(row + i, col + j)) for i, j in MOORE]
+
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """
+        Get the bounding box of the non-default cells.
+
+        Returns
+        -------
+        Tuple[int, int, int, int]
+            (min_row, min_col, max_row, max_col), inclusive.
+        """
+        if not self.cells:
+            raise ValueError("grid has no non-default cells")
+        rows = [row for row, _ in self.cells]
+        cols = [col for _, col in self.cells]
+        return min(rows), min(cols), max(rows), max(cols)
+
+    def step(self, task: "Task") -> List[Tuple[int, int]]:
+        """
+        Apply a rule task to the grid for one generation.
+
+        Parameters
+        ----------
+        task: Task
+            The rule task to apply. ``execute(cell, neighbors)`` must return
+            the next state of the cell. RuleTables are given the neighbors of
+            their own neighborhood, other tasks the eight Moore neighbors.
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            Positions of the cells whose state changed.
+        """
+        candidates = dict.fromkeys(self.cells)
+        for row, col in self.cells:
+            candidates.update(dict.fromkeys((row + i, col + j) for i, j in MOORE))
+
+        offsets = task.offsets if isinstance(task, RuleTable) else MOORE
+        updates = []
+        for row, col in candidates:
+            state = self.get_state(row, col)
+            neighbors = [self._view(self.get_state(row + i, col + j)) for i, j in offsets]
+            new_state = task.execute(self._view(state), neighbors)
+            if new_state != state:
+                updates.append((row, col, new_state))
+
+        for row, col, new_state in updates:
+            self.set_state(row, col, new_state)
+
+        return [(row, col) for row, col, _ in updates]
+
+    def _view(self, state: str) -> "Substrate":
+        view = self._views.get(state)
+        if view is None:
+            view = self._views[state] = Substrate(state, "Cell")
+        return view
@@ -0,0 +1,270 @@
+"""
+Hashlife is a memoized quadtree engine for two-state, outer-totalistic
+cellular automata on a Moore neighborhood (Life-like rules).
+
+The plane is stored as a quadtree whose identical sub-squares are shared, and
+the future of every sub-square is cached. Large, regular patterns can then be
+advanced by exponentially many generations at a fraction of the cost of
+stepping them one generation at a time.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from constructor.grid import SparseGrid
+from constructor.rule import life_like
+
+if TYPE_CHECKING:
+    from constructor.task import Task
+
+
+class _Node:
+    """
+    A canonical quadtree node of level ``k`` covering a 2^k x 2^k square.
+
+    Children are ordered top-left (a), top-right (b), bottom-left (c) and
+    bottom-right (d).
+    """
+
+    __slots__ = ("k", "a", "b", "c", "d", "n")
+
+    def __init__(self, k: int, a, b, c, d, n: int) -> None:
+        self.k = k
+        self.a = a
+        self.b = b
+        self.c = c
+        self.d = d
+        self.n = n
+
+
+_OFF = _Node(0, None, None, None, None, 0)
+_ON = _Node(0, None, None, None, None, 1)
+
+
+class HashLife:
+    """
+    A hashlife engine for a Life-like rule.
+
+    Attributes
+    ----------
+    birth: frozenset
+        Numbers of alive neighbors that make a dead cell alive.
+    survive: frozenset
+        Numbers of alive neighbors that keep an alive cell alive.
+
+    Methods
+    -------
+    from_task(task: Task, alive: str, dead: str) -> HashLife
+        Build an engine from a rule task, if the task is a Life-like rule.
+    advance(grid: SparseGrid, generations: int) -> None
+        Advance a sparse grid by a number of generations.
+    clear_cache() -> None
+        Drop all memoized nodes and results.
+    """
+
+    def __init__(self, birth: Iterable[int], survive: Iterable[int]) -> None:
+        """
+        Initialize a HashLife engine.
+
+        Parameters
+        ----------
+        birth: Iterable[int]
+            Numbers of alive neighbors that make a dead cell alive.
+        survive: Iterable[int]
+            Numbers of alive neighbors that keep an alive cell alive.
+        """
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        if 0 in self.birth:
+            raise ValueError("rules with birth on 0 neighbors are not supported")
+        self.clear_cache()
+
+    @classmethod
+    def from_task(cls, task: "Task", alive: str = "alive", dead: str = "dead") -> "HashLife":
+        """
+        Build an engine from a rule task, if the task is a Life-like rule.
+
+        See ``constructor.rule.life_like`` for when a task qualifies.
+
+        Parameters
+        ----------
+        task: Task
+            The rule task.
+        alive: str
+            The alive state.
+        dead: str
+            The dead (background) state.
+
+        Returns
+        -------
+        HashLife
+            The engine for the task's rule.
+        """
+        return cls(*life_like(task, alive, dead))
+
+    def clear_cache(self) -> None:
+        """
+        Drop all memoized nodes and results.
+        """
+        self._nodes: Dict[Tuple[int, int, int, int], _Node] = {}
+        self._zeros: List[_Node] = [_OFF]
+        self._successors: Dict[Tuple[int, int], _Node] = {}
+
+    def advance(self, grid: SparseGrid, generations: int) -> None:
+        """
+        Advance a sparse grid by a number of generations.
+
+        Parameters
+        ----------
+        grid: SparseGrid
+            The grid to advance in place. Its default state is the dead state
+            and every stored cell is alive.
+        generations: int
+            Number of generations to advance.
+        """
+        if generations < 0:
+            raise ValueError("generations must be non-negative")
+        if not grid.cells or generations == 0:
+            return
+
+        alive = set(grid.cells.values())
+        if len(alive) != 1:
+            raise ValueError("hashlife grids must only store cells in the alive state")
+        (state,) = alive
+
+        min_row, min_col, max_row, max_col = grid.bounds()
+        k = max(max_row - min_row, max_col - min_col, 1).bit_length()
+        node = self._build(set(grid.cells), min_row, min_col, k)
+        # Track the centre of the node; centering and successors preserve it
+        half = 1 << (k - 1)
+        center = (min_row + half, min_col + half)
+
+        j = 0
+        while generations:
+            if generations & 1:
+                node = self._advance_power(node, j)
+            generations >>= 1
+            j += 1
+
+        half = 1 << (node.k - 1)
+        cells: Dict[Tuple[int, int], str] = {}
+        self._collect(node, center[0] - half, center[1] - half, cells, state)
+        grid.cells = cells
+
+    def _join(self, a: _Node, b: _Node, c: _Node, d: _Node) -> _Node:
+        key = (id(a), id(b), id(c), id(d))
+        node = self._nodes.get(key)
+        if node is None:
+            node = _Node(a.k + 1, a, b, c, d, a.n + b.n + c.n + d.n)
+            self._nodes[key] = node
+        return node
+
+    def _zero(self, k: int) -> _Node:
+        while len(self._zeros) <= k:
+            z = self._zeros[-1]
+            self._zeros.append(self._join(z, z, z, z))
+        return self._zeros[k]
+
+    def _centre(self, m: _Node) -> _Node:
+        z = self._zero(m.k - 1)
+        return self._join(
+            self._join(z, z, z, m.a),
+            self._join(z, z, m.b, z),
+            self._join(z, m.c, z, z),
+            self._join(m.d, z, z, z),
+        )
+
+    def _build(self, points: set, row: int, col: int, k: int) -> _Node:
+        if not points:
+            return self._zero(k)
+        if k == 0:
+            return _ON
+        half = 1 << (k - 1)
+        quadrants: Tuple[set, set, set, set] = (set(), set(), set(), set())
+        for r, c in points:
+            quadrants[(2 if r >= row + half else 0) + (1 if c >= col + half else 0)].add((r, c))
+        return self._join(
+            self._build(quadrants[0], row, col, k - 1),
+            self._build(quadrants[1], row, col + half, k - 1),
+            self._build(quadrants[2], row + half, col, k - 1),
+            self._build(quadrants[3], row + half, col + half, k - 1),
+        )
+
+    def _collect(self, node: _Node, row: int, col: int, cells: dict, state: str) -> None:
+        if node.n == 0:
+            return
+        if node.k == 0:
+            cells[(row, col)] = state
+            return
+        half = 1 << (node.k - 1)
+        self._collect(node.a, row, col, cells, state)
+        self._collect(node.b, row, col + half, cells, state)
+        self._collect(node.c, row + half, col, cells, state)
+        self._collect(node.d, row + half, col + half, cells, state)
+
+    def _is_padded(self, m: _Node) -> bool:
+        # All alive cells lie in the central half of the node
+        return m.k >= 2 and m.n == m.a.d.n + m.b.c.n + m.c.b.n + m.d.a.n
+
+    def _advance_power(self, node: _Node, j: int) -> _Node:
+        # Pad so the pattern cannot outgrow the successor's square in 2^j generations
+        while node.k < j + 2 or not self._is_padded(node):
+            node = self._centre(node)
+        return self._successor(self._centre(node), j)
+
+    def _life_4x4(self, m: _Node) -> _Node:
+        bits = [
+            [m.a.a.n, m.a.b.n, m.b.a.n, m.b.b.n],
+            [m.a.c.n, m.a.d.n, m.b.c.n, m.b.d.n],
+            [m.c.a.n, m.c.b.n, m.d.a.n, m.d.b.n],
+            [m.c.c.n, m.c.d.n, m.d.c.n, m.d.d.n],
+        ]
+        inner = []
+        for r, c in ((1, 1), (1, 2), (2, 1), (2, 2)):
+            count = sum(bits[r + i][c + j] for i in (-1, 0, 1) for j in (-1, 0, 1)) - bits[r][c]
+            rule = self.survive if bits[r][c] else self.birth
+            inner.append(_ON if count in rule else _OFF)
+        return self._join(*inner)
+
+    def _successor(self, m: _Node, j: int) -> _Node:
+        """
+        The centre of ``m`` (one level down) after 2^j generations.
+        """
+        key = (id(m), j)
+        result = self._successors.get(key)
+        if result is not None:
+            return result
+
+        if m.n == 0:
+            result = m.a
+        elif m.k == 2:
+            result = self._life_4x4(m)
+        else:
+            j = min(j, m.k - 2)
+            join, succ = self._join, self._successor
+            c1 = succ(join(m.a.a, m.a.b, m.a.c, m.a.d), j)
+            c2 = succ(join(m.a.b, m.b.a, m.a.d, m.b.c), j)
+            c3 = succ(join(m.b.a, m.b.b, m.b.c, m.b.d), j)
+            c4 = succ(join(m.a.c, m.a.d, m.c.a, m.c.b), j)
+            c5 = succ(join(m.a.d, m.b.c, m.c.b, m.d.a), j)
+            c6 = succ(join(m.b.c, m.b.d, m.d.a, m.d.b), j)
+            c7 = succ(join(m.c.a, m.c.b, m.c.c, m.c.d), j)
+            c8 = succ(join(m.c.b, m.d.a, m.c.d, m.d.c), j)
+            c9 = succ(join(m.d.a, m.d.b, m.d.c, m.d.d), j)
+            if j < m.k - 2:
+                # Only 2^j generations: take the centres without advancing further
+                result = join(
+                    join(c1.d, c2.c, c4.b, c5.a),
+                    join(c2.d, c3.c, c5.b, c6.a),
+                    join(c4.d, c5.c, c7.b, c8.a),
+                    join(c5.d, c6.c, c8.b, c9.a),
+                )
+            else:
+                result = join(
+                    succ(join(c1, c2, c4, c5), j),
+                    succ(join(c2, c3, c5, c6), j),
+                    succ(join(c4, c5, c7, c8), j),
+                    succ(join(c5, c6, c8, c9), j),
+                )
+
+        self._successors[key] = result
+        return result
@@ -7,8 +7,12 @@ in physical systems. The theory posits that the set of all possible tasks is
 determined by what constructors can perform.
 """
 
+import asyncio
+import inspect
 from typing import TYPE_CHECKING, List
 
+from constructor import trace
+
 if TYPE_CHECKING:
     from constructor.substrate import Substrate
     from constructor.task import Task
@@ -31,6 +35,8 @@ class Constructor:
         Check if the constructor can perform a given task.
     perform(task: Task, substrate: Substrate) -> bool
         Perform a task on a substrate if possible.
+    aperform(task: Task, substrate: Substrate) -> bool
+        Asynchronously perform a task on a substrate if possible.
     """
 
     def __init__(self, name: str, capabilities: List["Task"]) -> None:
@@ -80,6 +86,45 @@ class Constructor:
             True if the task was successfully performed, False otherwise.
         """
         if self.can_perform(task):
-            return task.execute(substrate)
+            result = task.execute(substrate)
+        else:
+            result = False
+
+        recorder = trace.active()
+        if recorder is not None:
+            recorder.record(trace.PERFORM, self, task, substrate, result)
+        return result
+
+    async def aperform(self, task: "Task", substrate: "Substrate") -> bool:
+        """
+        Asynchronously perform a task on a substrate if possible.
+
+        Checks the same as ``perform``: conditions are left to the task's
+        ``execute``, so serial and asynchronous runs make the same checks.
+        Tasks with a coroutine ``execute`` are awaited directly and can await
+        ``Task.ais_possible`` for coroutine conditions. Synchronous tasks run
+        in the default thread executor so they do not block the event loop.
+
+        Parameters
+        ----------
+        task: Task
+            Task to be performed.
+        substrate: Substrate
+            Substrate on which the task is performed.
+
+        Returns
+        -------
+        bool
+            True if the task was successfully performed, False otherwise.
+        """
+        if not self.can_perform(task):
+            result = False
+        elif inspect.iscoroutinefunction(task.execute):
+            result = await task.execute(substrate)
         else:
-            return False
+            result = await asyncio.to_thread(task.execute, substrate)
+
+        recorder = trace.active()
+        if recorder is not None:
+            recorder.record(trace.PERFORM, self, task, substrate, result)
+        return result
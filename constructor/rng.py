@@ -0,0 +1,131 @@
+"""
+Random number streams give every substrate, task or worker its own
+independent, reproducible source of randomness derived from one root seed.
+
+Streams are counter-based (Philox) NumPy generators keyed by a tuple such as
+``("substrate", 3)``. The same root seed and key always produce the same
+stream, no matter which process creates it or in what order streams are
+requested, so parallel and batched runs draw exactly the same numbers as a
+serial run.
+
+Stochastic tasks and conditions call ``current()`` to get the stream of the
+substrate being processed, which ``Simulation`` activates with ``use``.
+"""
+
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Hashable, Iterator, Tuple
+
+import numpy as np
+
+_current: ContextVar[np.random.Generator] = ContextVar("constructor_rng")
+_fallback = np.random.default_rng()
+
+
+def _key_to_ints(key: Tuple[Hashable, ...]) -> Tuple[int, ...]:
+    # Stable across processes, unlike hash() for strings
+    words = []
+    for part in key:
+        if isinstance(part, int) and part >= 0:
+            words.append(part)
+        else:
+            digest = hashlib.sha256(repr(part).encode()).digest()
+            words.append(int.from_bytes(digest[:8], "little"))
+    return tuple(words)
+
+
+class RandomStreams:
+    """
+    A family of independent random streams derived from one root seed.
+
+    Attributes
+    ----------
+    seed: int
+        The root seed. Drawn from the OS if not given.
+
+    Methods
+    -------
+    stream(*key: Hashable) -> np.random.Generator
+        Get the stream for a key.
+    use(*key: Hashable) -> Iterator[np.random.Generator]
+        Make the stream for a key the current stream within a block.
+    """
+
+    def __init__(self, seed: int = None) -> None:
+        """
+        Initialize a family of random streams.
+
+        Parameters
+        ----------
+        seed: int
+            The root seed. Drawn from the OS if not given.
+        """
+        self.seed = np.random.SeedSequence(seed).entropy
+        self._streams: Dict[Tuple[Hashable, ...], np.random.Generator] = {}
+
+    def __getstate__(self) -> dict:
+        # Workers rebuild their streams from the seed
+        return {"seed": self.seed}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["seed"])
+
+    def stream(self, *key: Hashable) -> np.random.Generator:
+        """
+        Get the stream for a key.
+
+        Repeated calls with the same key return the same generator, so draws
+        continue where they left off.
+
+        Parameters
+        ----------
+        key: Hashable
+            Parts of the key, e.g. ``("substrate", 3)``.
+
+        Returns
+        -------
+        np.random.Generator
+            The generator for the key.
+        """
+        generator = self._streams.get(key)
+        if generator is None:
+            sequence = np.random.SeedSequence(self.seed, spawn_key=_key_to_ints(key))
+            generator = np.random.Generator(np.random.Philox(sequence))
+            self._streams[key] = generator
+        return generator
+
+    @contextmanager
+    def use(self, *key: Hashable) -> Iterator[np.random.Generator]:
+        """
+        Make the stream for a key the current stream within a block.
+
+        Parameters
+        ----------
+        key: Hashable
+            Parts of the key, e.g. ``("substrate", 3)``.
+
+        Yields
+        ------
+        np.random.Generator
+            The generator for the key.
+        """
+        generator = self.stream(*key)
+        token = _current.set(generator)
+        try:
+            yield generator
+        finally:
+            _current.reset(token)
+
+
+def current() -> np.random.Generator:
+    """
+    Get the current random stream.
+
+    Returns
+    -------
+    np.random.Generator
+        The stream activated by ``RandomStreams.use``, or an unseeded
+        generator outside of any stream.
+    """
+    return _current.get(_fallback)
@@ -0,0 +1,443 @@
+"""
+Rules describe how a cellular automaton task maps a cell and its neighbors to
+the cell's next state.
+
+Rule tasks are written cell by cell with ``execute(cell, neighbors)``. Engines
+that work on many cells at once (hashlife, vectorized and multi-process grids)
+instead need the rule as data. A ``RuleTable`` is a rule stored as a lookup
+table, either declared directly (totalistic or outer-totalistic) or compiled
+from a pure rule task by evaluating it on every neighborhood configuration.
+A whole grid of state codes then advances with one gather per generation.
+"""
+
+from itertools import product
+from typing import Callable, Dict, FrozenSet, List, Sequence, Tuple
+
+import numpy as np
+
+from constructor.substrate import Substrate
+from constructor.task import Task
+
+#: Offsets of the eight cells surrounding a cell
+MOORE = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if (i, j) != (0, 0)]
+#: Offsets of the four orthogonally adjacent cells
+VON_NEUMANN = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+
+NEIGHBORHOODS: Dict[str, List[Tuple[int, int]]] = {
+    "moore": MOORE,
+    "von_neumann": VON_NEUMANN,
+}
+
+TOTALISTIC = "totalistic"
+OUTER_TOTALISTIC = "outer_totalistic"
+FULL = "full"
+
+
+class RuleTable(Task):
+    """
+    A cellular automaton rule stored as a lookup table.
+
+    States are numbered by their position in ``states``; the first state is
+    the background. Depending on ``kind``, the table is indexed by:
+
+    - ``"totalistic"``: the sum of the state numbers of the cell and its
+      neighbors.
+    - ``"outer_totalistic"``: the cell's state and how many neighbors are in
+      each non-background state.
+    - ``"full"``: the states of the cell and each of its neighbors, in the
+      order of the neighborhood's offsets.
+
+    A RuleTable is itself a rule task and can be used wherever one is
+    expected.
+
+    Attributes
+    ----------
+    name: str
+        Name of the rule.
+    states: List[str]
+        The cell states; the first is the background.
+    neighborhood: str
+        ``"moore"`` or ``"von_neumann"``.
+    kind: str
+        ``"totalistic"``, ``"outer_totalistic"`` or ``"full"``.
+    table: np.ndarray
+        Next state numbers. Shape (S-1) * (N+1) + 1 for totalistic rules,
+        (S, (N+1)^(S-1)) for outer-totalistic rules and (S,) * (N+1) for full
+        rules, with S states and N neighbors.
+
+    Methods
+    -------
+    totalistic(states, rule, neighborhood) -> RuleTable
+        Declare a rule of the sum of the states of a cell and its neighbors.
+    outer_totalistic(states, rule, neighborhood) -> RuleTable
+        Declare a rule of a cell's state and its neighbors' state counts.
+    life_like(birth, survive, alive, dead) -> RuleTable
+        Declare a two-state Moore rule from birth and survival counts.
+    compile(task, states, neighborhood) -> RuleTable
+        Compile a pure rule task into the smallest table that represents it.
+    outer_totalistic_table() -> np.ndarray
+        Get the rule as an outer-totalistic table.
+    apply(codes: np.ndarray, generations: int = 1) -> np.ndarray
+        Advance a grid of state numbers.
+    execute(cell: Substrate, neighbors: List[Substrate]) -> str
+        Get the next state of a single cell.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        states: Sequence[str],
+        neighborhood: str,
+        kind: str,
+        table: np.ndarray,
+    ) -> None:
+        """
+        Initialize a RuleTable.
+
+        Parameters
+        ----------
+        name: str
+            Name of the rule.
+        states: Sequence[str]
+            The cell states; the first is the background.
+        neighborhood: str
+            ``"moore"`` or ``"von_neumann"``.
+        kind: str
+            ``"totalistic"``, ``"outer_totalistic"`` or ``"full"``.
+        table: np.ndarray
+            Next state numbers, shaped as described for ``kind``.
+        """
+        super().__init__(name)
+        if neighborhood not in NEIGHBORHOODS:
+            raise ValueError(f"unknown neighborhood {neighborhood!r}")
+        if kind not in (TOTALISTIC, OUTER_TOTALISTIC, FULL):
+            raise ValueError(f"unknown rule kind {kind!r}")
+        self.states = list(states)
+        self.neighborhood = neighborhood
+        self.kind = kind
+        self.table = np.asarray(table, dtype=np.min_scalar_type(len(self.states) - 1))
+        self.index = {state: i for i, state in enumerate(self.states)}
+
+        s, n = len(self.states), len(self.offsets)
+        if kind == TOTALISTIC:
+            shape: Tuple[int, ...] = ((s - 1) * (n + 1) + 1,)
+        elif kind == OUTER_TOTALISTIC:
+            shape = (s, (n + 1) ** (s - 1))
+        else:
+            shape = (s,) * (n + 1)
+        if self.table.shape != shape:
+            raise ValueError(f"{kind} table must have shape {shape}, got {self.table.shape}")
+        self._flat = self.table.ravel()
+
+        # Per-state contribution of a neighbor to the flat table index
+        if kind == TOTALISTIC:
+            self._center_weight = 1
+            self._weights = [np.arange(s)] * n
+        elif kind == OUTER_TOTALISTIC:
+            self._center_weight = shape[1]
+            counts = np.array([0] + [(n + 1) ** i for i in range(s - 1)])
+            self._weights = [counts] * n
+        else:
+            self._center_weight = s**n
+            self._weights = [np.arange(s) * s ** (n - 1 - k) for k in range(n)]
+
+    @property
+    def offsets(self) -> List[Tuple[int, int]]:
+        """
+        The neighbor offsets, in the order used by full tables.
+        """
+        return NEIGHBORHOODS[self.neighborhood]
+
+    @classmethod
+    def totalistic(
+        cls,
+        states: Sequence[str],
+        rule: Callable[[int], str],
+        neighborhood: str = "moore",
+        name: str = "Totalistic rule",
+    ) -> "RuleTable":
+        """
+        Declare a rule of the sum of the states of a cell and its neighbors.
+
+        Parameters
+        ----------
+        states: Sequence[str]
+            The cell states; the first is the background.
+        rule: Callable[[int], str]
+            Maps the sum of the state numbers of a cell and its neighbors to
+            the cell's next state.
+        neighborhood: str
+            ``"moore"`` or ``"von_neumann"``.
+        name: str
+            Name of the rule.
+
+        Returns
+        -------
+        RuleTable
+            The rule.
+        """
+        index = {state: i for i, state in enumerate(states)}
+        n = len(NEIGHBORHOODS[neighborhood])
+        table = [index[rule(total)] for total in range((len(states) - 1) * (n + 1) + 1)]
+        return cls(name, states, neighborhood, TOTALISTIC, np.array(table))
+
+    @classmethod
+    def outer_totalistic(
+        cls,
+        states: Sequence[str],
+        rule: Callable[[str, Dict[str, int]], str],
+        neighborhood: str = "moore",
+        name: str = "Outer-totalistic rule",
+    ) -> "RuleTable":
+        """
+        Declare a rule of a cell's state and its neighbors' state counts.
+
+        Parameters
+        ----------
+        states: Sequence[str]
+            The cell states; the first is the background.
+        rule: Callable[[str, Dict[str, int]], str]
+            Maps a cell's state and the number of neighbors in each state to
+            the cell's next state.
+        neighborhood: str
+            ``"moore"`` or ``"von_neumann"``.
+        name: str
+            Name of the rule.
+
+        Returns
+        -------
+        RuleTable
+            The rule.
+        """
+        index = {state: i for i, state in enumerate(states)}
+        s, n = len(states), len(NEIGHBORHOODS[neighborhood])
+        table = np.zeros((s, (n + 1) ** (s - 1)), dtype=int)
+        for counts in product(range(n + 1), repeat=s - 1):
+            if sum(counts) > n:
+                continue  # Unreachable
+            column = sum(c * (n + 1) ** i for i, c in enumerate(counts))
+            by_state = dict(zip(states, (n - sum(counts),) + counts))
+            for center, state in enumerate(states):
+                table[center, column] = index[rule(state, by_state)]
+        return cls(name, states, neighborhood, OUTER_TOTALISTIC, table)
+
+    @classmethod
+    def life_like(
+        cls,
+        birth: Sequence[int],
+        survive: Sequence[int],
+        alive: str = "alive",
+        dead: str = "dead",
+        name: str = "Life-like rule",
+    ) -> "RuleTable":
+        """
+        Declare a two-state Moore rule from birth and survival counts.
+
+        Parameters
+        ----------
+        birth: Sequence[int]
+            Numbers of alive neighbors that make a dead cell alive.
+        survive: Sequence[int]
+            Numbers of alive neighbors that keep an alive cell alive.
+        alive: str
+            The alive state.
+        dead: str
+            The dead (background) state.
+        name: str
+            Name of the rule.
+
+        Returns
+        -------
+        RuleTable
+            The rule.
+        """
+        table = np.zeros((2, 9), dtype=int)
+        table[0, list(birth)] = 1
+        table[1, list(survive)] = 1
+        return cls(name, [dead, alive], "moore", OUTER_TOTALISTIC, table)
+
+    @classmethod
+    def compile(
+        cls,
+        task: "Task",
+        states: Sequence[str],
+        neighborhood: str = "moore",
+        max_configurations: int = 1 << 20,
+    ) -> "RuleTable":
+        """
+        Compile a pure rule task into the smallest table that represents it.
+
+        The task's ``execute(cell, neighbors)`` is evaluated on every
+        configuration of a cell and its neighbors, with neighbors passed in
+        the order of the neighborhood's offsets. The result is reduced to a
+        totalistic or outer-totalistic table when the task's outputs allow it.
+
+        Parameters
+        ----------
+        task: Task
+            The rule task. Must depend only on the states of the cell and its
+            neighbors and return one of ``states``.
+        states: Sequence[str]
+            The cell states; the first is the background.
+        neighborhood: str
+            ``"moore"`` or ``"von_neumann"``.
+        max_configurations: int
+            Refuse to compile if there are more configurations than this.
+
+        Returns
+        -------
+        RuleTable
+            The compiled rule, named after the task.
+        """
+        index = {state: i for i, state in enumerate(states)}
+        s, n = len(states), len(NEIGHBORHOODS[neighborhood])
+        if s ** (n + 1) > max_configurations:
+            raise ValueError(f"{s ** (n + 1)} configurations exceed max_configurations")
+
+        cells = [Substrate(state, "Cell") for state in states]
+        full = np.empty(s ** (n + 1), dtype=int)
+        for i, (center, *neighbors) in enumerate(product(range(s), repeat=n + 1)):
+            result = task.execute(cells[center], [cells[k] for k in neighbors])
+            if result not in index:
+                raise ValueError(f"{task.name} returned {result!r}, which is not one of {list(states)}")
+            full[i] = index[result]
+
+        configurations = np.array(list(product(range(s), repeat=n + 1))).reshape(-1, n + 1)
+        for kind in (TOTALISTIC, OUTER_TOTALISTIC):
+            table = cls._reduce(kind, full, configurations, s, n)
+            if table is not None:
+                return cls(task.name, states, neighborhood, kind, table)
+        return cls(task.name, states, neighborhood, FULL, full.reshape((s,) * (n + 1)))
+
+    @staticmethod
+    def _reduce(kind: str, full: np.ndarray, configurations: np.ndarray, s: int, n: int):
+        if kind == TOTALISTIC:
+            keys = configurations.sum(axis=1)
+            shape: Tuple[int, ...] = ((s - 1) * (n + 1) + 1,)
+        else:
+            counts = (configurations[:, 1:, None] == np.arange(1, s)).sum(axis=1)
+            columns = counts @ ((n + 1) ** np.arange(s - 1))
+            keys = configurations[:, 0] * (n + 1) ** (s - 1) + columns
+            shape = (s, (n + 1) ** (s - 1))
+        table = np.zeros(int(np.prod(shape)), dtype=int)
+        table[keys] = full
+        # The reduction holds if every configuration agrees with its key's entry
+        if not np.array_equal(table[keys], full):
+            return None
+        return table.reshape(shape)
+
+    def outer_totalistic_table(self) -> np.ndarray:
+        """
+        Get the rule as an outer-totalistic table.
+
+        Returns
+        -------
+        np.ndarray
+            Table of shape (S, (N+1)^(S-1)) indexed by the cell's state and
+            its neighbors' state counts.
+        """
+        if self.kind == OUTER_TOTALISTIC:
+            return self.table
+        if self.kind == FULL:
+            raise ValueError(f"{self.name} is not an outer-totalistic rule")
+        s, n = len(self.states), len(self.offsets)
+        table = np.zeros((s, (n + 1) ** (s - 1)), dtype=self.table.dtype)
+        for counts in product(range(n + 1), repeat=s - 1):
+            if sum(counts) > n:
+                continue
+            column = sum(c * (n + 1) ** i for i, c in enumerate(counts))
+            total = sum(state * c for state, c in enumerate(counts, start=1))
+            table[:, column] = self.table[np.arange(s) + total]
+        return table
+
+    def apply(self, codes: np.ndarray, generations: int = 1, background: int = 0) -> np.ndarray:
+        """
+        Advance a grid of state numbers.
+
+        Cells outside the grid are treated as being in the background state.
+
+        Parameters
+        ----------
+        codes: np.ndarray
+            2D array of state numbers (positions in ``states``).
+        generations: int
+            Number of generations to advance.
+        background: int
+            State number of the cells outside the grid. Defaults to the
+            table's background, ``states[0]``.
+
+        Returns
+        -------
+        np.ndarray
+            The state numbers after ``generations`` generations.
+        """
+        codes = np.asarray(codes)
+        rows, cols = codes.shape
+        for _ in range(generations):
+            padded = np.pad(codes, 1, constant_values=background)
+            index = codes.astype(np.intp) * self._center_weight
+            for (i, j), weights in zip(self.offsets, self._weights):
+                index += weights[padded[1 + i : 1 + i + rows, 1 + j : 1 + j + cols]]
+            codes = self._flat[index]
+        return codes
+
+    def execute(self, cell: "Substrate", neighbors: List["Substrate"]) -> str:
+        """
+        Get the next state of a single cell.
+
+        Parameters
+        ----------
+        cell: Substrate
+            The cell.
+        neighbors: List[Substrate]
+            The neighboring cells, one per offset of the neighborhood and in
+            the same order.
+
+        Returns
+        -------
+        str
+            The cell's next state.
+        """
+        if len(neighbors) != len(self.offsets):
+            raise ValueError(f"{self.name} needs exactly {len(self.offsets)} neighbors")
+        weights = self._weights[0] if self.kind != FULL else None
+        index = self.index[cell.state] * self._center_weight
+        for k, neighbor in enumerate(neighbors):
+            code = self.index[neighbor.state]
+            index += int(weights[code] if weights is not None else self._weights[k][code])
+        return self.states[self._flat[index]]
+
+
+def life_like(
+    task: "Task", alive: str = "alive", dead: str = "dead"
+) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+    """
+    Get the birth and survival counts of a Life-like rule task.
+
+    The task is Life-like if it only returns ``alive`` or ``dead`` and the
+    result depends only on the cell's state and the number of alive neighbors
+    in its Moore neighborhood.
+
+    Parameters
+    ----------
+    task: Task
+        The rule task, or a two-state Moore RuleTable.
+    alive: str
+        The alive state.
+    dead: str
+        The dead state.
+
+    Returns
+    -------
+    Tuple[FrozenSet[int], FrozenSet[int]]
+        Numbers of alive neighbors that make a dead cell alive (birth) and
+        that keep an alive cell alive (survival).
+    """
+    if not isinstance(task, RuleTable):
+        task = RuleTable.compile(task, [dead, alive])
+    if task.neighborhood != "moore" or task.states != [dead, alive]:
+        raise ValueError(f"{task.name} is not a two-state Moore rule on {[dead, alive]}")
+    table = task.outer_totalistic_table()
+    birth = frozenset(np.nonzero(table[0])[0].tolist())
+    survive = frozenset(np.nonzero(table[1])[0].tolist())
+    return birth, survive
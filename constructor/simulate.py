@@ -2,7 +2,11 @@
 Simulations are used to explore the behavior of constructors and substrates.
 """
 
-from typing import TYPE_CHECKING, List
+import asyncio
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Tuple
+
+from constructor.rng import RandomStreams
+from constructor.substrate import state_of
 
 if TYPE_CHECKING:
     from constructor.main import Constructor
@@ -22,11 +26,32 @@ class Simulation:
         List of Substrate objects.
     tasks: List[Task]
         List of Task objects.
+    dispatch: List[Tuple[Constructor, Task]]
+        Precomputed (constructor, task) pairs where the constructor is capable
+        of the task.
+    neighbors: Callable[[Substrate], List[Substrate]]
+        Optional function returning the substrates affected when a substrate
+        changes state. Used by incremental stepping.
+    dirty: Dict[Substrate, None]
+        Ordered set of substrates to evaluate on the next step.
+    streams: RandomStreams
+        Random streams; each substrate's stream is current while its tasks
+        are performed.
 
     Methods
     -------
+    build_dispatch() -> None
+        Rebuild the dispatch index from the current constructors and tasks.
+    viable(substrate: Substrate) -> List[Tuple[Constructor, Task]]
+        Get the (constructor, task) pairs that apply to a substrate.
+    mark_dirty(substrate: Substrate) -> None
+        Schedule a substrate to be evaluated on the next step.
+    step() -> List[Substrate]
+        Evaluate only the dirty substrates and return those that changed.
     run() -> None
         Run the simulation, applying constructors to substrates according to their tasks.
+    arun(concurrency: int = 100) -> None
+        Run the simulation asynchronously with a limit on concurrent tasks.
     """
 
     def __init__(
@@ -34,6 +59,8 @@ class Simulation:
         constructors: List["Constructor"],
         substrates: List["Substrate"],
         tasks: List["Task"],
+        neighbors: Callable[["Substrate"], List["Substrate"]] = None,
+        seed: int = None,
     ) -> None:
         """
         Initialize the simulation environment.
@@ -46,23 +73,191 @@ class Simulation:
             List of Substrate objects.
         tasks: List[Task]
             List of Task objects.
+        neighbors: Callable[[Substrate], List[Substrate]]
+            Optional function returning the substrates affected when a
+            substrate changes state. Used by incremental stepping.
+        seed: int
+            Root seed of the random streams. Runs with the same seed draw the
+            same numbers whether they are serial, stepped or asynchronous.
+            Each substrate's stream is keyed by the order it was first seen
+            in, starting with the ``substrates`` list.
         """
         self.constructors = constructors
         self.substrates = substrates
         self.tasks = tasks
+        self.neighbors = neighbors
+        self.dirty: Dict["Substrate", None] = dict.fromkeys(substrates)
+        self.streams = RandomStreams(seed)
+        self._indices = {substrate: i for i, substrate in enumerate(substrates)}
+        self.build_dispatch()
+
+    def build_dispatch(self) -> None:
+        """
+        Rebuild the dispatch index from the current constructors and tasks.
+
+        Must be called again if constructors, their capabilities or tasks are
+        changed after the simulation is created.
+        """
+        self.dispatch = [
+            (constructor, task)
+            for constructor in self.constructors
+            for task in self.tasks
+            if constructor.can_perform(task)
+        ]
+        self._by_state: Dict[Hashable, List[int]] = {}
+
+    def viable(self, substrate: "Substrate") -> List[Tuple["Constructor", "Task"]]:
+        """
+        Get the (constructor, task) pairs that apply to a substrate.
+
+        Pairs are filtered by a snapshot of the substrate's current state
+        using ``Task.applies_to`` and cached per state. Running the
+        simulation re-checks the state after every task, so a task that
+        moves the substrate to a new state enables the pairs of that state.
+
+        Parameters
+        ----------
+        substrate: Substrate
+            The substrate to dispatch on.
+
+        Returns
+        -------
+        List[Tuple[Constructor, Task]]
+            The viable (constructor, task) pairs.
+        """
+        return [self.dispatch[i] for i in self._viable_indices(state_of(substrate))]
+
+    def _viable_indices(self, state: Any) -> List[int]:
+        try:
+            return self._by_state[state]
+        except KeyError:
+            indices = [i for i, (_, t) in enumerate(self.dispatch) if t.applies_to(state)]
+            self._by_state[state] = indices
+            return indices
+        except TypeError:
+            # Unhashable states (e.g. dicts) are filtered without caching
+            return [i for i, (_, t) in enumerate(self.dispatch) if t.applies_to(state)]
+
+    def _pairs(self, substrate: "Substrate") -> Iterator[Tuple["Constructor", "Task"]]:
+        """
+        Yield the viable pairs in dispatch order, following state changes.
+        """
+        state = state_of(substrate)
+        indices = self._viable_indices(state)
+        k = 0
+        while k < len(indices):
+            i = indices[k]
+            yield self.dispatch[i]
+            current = state_of(substrate)
+            if current != state:
+                state = current
+                indices = [j for j in self._viable_indices(state) if j > i]
+                k = 0
+            else:
+                k += 1
+
+    def mark_dirty(self, substrate: "Substrate") -> None:
+        """
+        Schedule a substrate to be evaluated on the next step.
+
+        Call this after changing a substrate outside of the simulation.
+
+        Parameters
+        ----------
+        substrate: Substrate
+            The substrate to schedule.
+        """
+        self.dirty[substrate] = None
+
+    def step(self) -> List["Substrate"]:
+        """
+        Evaluate only the dirty substrates and return those that changed.
+
+        A substrate is considered changed when its state compares unequal
+        after its viable tasks were performed, so states should be replaced
+        rather than mutated in place. Changed substrates and their neighbors
+        are scheduled for the next step; everything else stays idle until
+        marked dirty again.
+
+        Returns
+        -------
+        List[Substrate]
+            The substrates whose state changed during this step.
+        """
+        dirty, self.dirty = self.dirty, {}
+        changed = []
+        for substrate in dirty:
+            before = state_of(substrate)
+            with self._stream(substrate):
+                for constructor, task in self._pairs(substrate):
+                    constructor.perform(task, substrate)
+            if state_of(substrate) != before:
+                changed.append(substrate)
+
+        for substrate in changed:
+            self.dirty[substrate] = None
+            if self.neighbors is not None:
+                for neighbor in self.neighbors(substrate):
+                    self.dirty[neighbor] = None
+
+        return changed
 
     def run(self) -> None:
         """
         Run the simulation, applying constructors to substrates according to their tasks.
+
+        Only the viable (constructor, task) pairs from the dispatch index are
+        evaluated for each substrate.
         """
         for substrate in self.substrates:
-            for constructor in self.constructors:
-                for task in self.tasks:
-                    if constructor.perform(task, substrate):
-                        print(
-                            f"{constructor.name} successfully performed {task.name} on {substrate.name}"
-                        )
-                    else:
-                        print(
-                            f"{constructor.name} could not perform {task.name} on {substrate.name}"
-                        )
+            with self._stream(substrate):
+                for constructor, task in self._pairs(substrate):
+                    self._report(constructor, task, substrate, constructor.perform(task, substrate))
+
+    async def arun(self, concurrency: int = 100) -> None:
+        """
+        Run the simulation asynchronously with a limit on concurrent tasks.
+
+        Substrates are processed concurrently while the viable tasks for each
+        substrate are performed in order, as in ``run``. Coroutine tasks and
+        conditions are awaited directly; synchronous ones run in the default
+        thread executor.
+
+        Parameters
+        ----------
+        concurrency: int
+            Maximum number of tasks being performed at the same time.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_substrate(substrate: "Substrate") -> None:
+            # Each gathered coroutine runs in its own context, so streams don't mix
+            with self._stream(substrate):
+                for constructor, task in self._pairs(substrate):
+                    async with semaphore:
+                        performed = await constructor.aperform(task, substrate)
+                    self._report(constructor, task, substrate, performed)
+
+        await asyncio.gather(*(run_substrate(s) for s in self.substrates))
+
+    def _stream(self, substrate: "Substrate"):
+        # Substrates appended later or reached through neighbors() are
+        # registered on first use
+        index = self._indices.setdefault(substrate, len(self._indices))
+        return self.streams.use("substrate", index)
+
+    def _report(
+        self,
+        constructor: "Constructor",
+        task: "Task",
+        substrate: "Substrate",
+        performed: bool,
+    ) -> None:
+        if performed:
+            print(
+                f"{constructor.name} successfully performed {task.name} on {substrate.name}"
+            )
+        else:
+            print(
+                f"{constructor.name} could not perform {task.name} on {substrate.name}"
+            )
@@ -0,0 +1,350 @@
+"""
+Storage saves and loads substrate populations, task catalogs and state graphs
+in a compact columnar format: a NumPy ``.npz`` archive with one array per
+column.
+
+Repeated strings (names, states, condition names) are interned into a table
+of unique values plus an integer code per row, so no object is pickled.
+Uncompressed archives can be loaded memory-mapped, which makes opening large
+files nearly free until the columns are actually read.
+"""
+
+import zipfile
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from constructor.substrate import ComplexSubstrate, Substrate
+from constructor.task import Task
+
+if TYPE_CHECKING:
+    from constructor.condition import Condition
+
+
+def _intern(values: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split values into a table of unique strings and an int32 code per value.
+    """
+    index: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (index.setdefault(v, len(index)) for v in values), dtype=np.int32
+    )
+    for value in index:
+        if not isinstance(value, str):
+            raise TypeError(f"only string values can be stored, got {value!r}")
+    return np.array(list(index), dtype=str), codes
+
+
+def _ragged(lists: Iterable[Iterable[Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Store a list of string lists (None allowed) as interned values and offsets.
+    """
+    offsets = [0]
+    flat: List[Any] = []
+    for values in lists:
+        if values is None:
+            offsets.append(-1)
+            continue
+        flat.extend(values)
+        offsets.append(len(flat))
+    table, codes = _intern(flat)
+    return table, codes, np.array(offsets, dtype=np.int64)
+
+
+def _unragged(table: np.ndarray, codes: np.ndarray, offsets: np.ndarray) -> List[List[str]]:
+    values = table[codes].tolist()
+    lists, start = [], 0
+    for stop in offsets[1:].tolist():
+        if stop < 0:
+            lists.append(None)
+            continue
+        lists.append(values[start:stop])
+        start = stop
+    return lists
+
+
+def save_columns(path: str, kind: str, columns: Dict[str, np.ndarray], compressed: bool = False) -> None:
+    """
+    Save named columns to an ``.npz`` archive.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    kind: str
+        What the archive holds, checked on load.
+    columns: Dict[str, np.ndarray]
+        The columns to save.
+    compressed: bool
+        If True, compress the archive. Compressed archives can't be
+        memory-mapped.
+    """
+    save = np.savez_compressed if compressed else np.savez
+    with open(path, "wb") as f:
+        save(f, kind=np.array(kind), **columns)
+
+
+def load_columns(path: str, kind: str, mmap: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Load named columns from an ``.npz`` archive.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    kind: str
+        What the archive is expected to hold.
+    mmap: bool
+        If True, memory-map the columns of an uncompressed archive instead
+        of reading them.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        The columns, by name.
+    """
+    if mmap:
+        columns = _mmap_npz(path)
+    else:
+        with np.load(path) as archive:
+            columns = {name: archive[name] for name in archive.files}
+    found = str(columns.pop("kind"))
+    if found != kind:
+        raise ValueError(f"{path} holds {found}, not {kind}")
+    return columns
+
+
+def _mmap_npz(path: str) -> Dict[str, np.ndarray]:
+    columns = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path} is compressed and can't be memory-mapped")
+            # Skip the zip local file header to reach the .npy data
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype="<u2")
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[: -len(".npy")]
+            if not shape or 0 in shape:
+                # Scalars and empty arrays can't be mapped, but they are tiny
+                count = int(np.prod(shape))
+                data = f.read(count * dtype.itemsize)
+                columns[name] = np.frombuffer(data, dtype=dtype).reshape(shape)
+                continue
+            columns[name] = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=f.tell(),
+                shape=shape,
+                order="F" if fortran else "C",
+            )
+    return columns
+
+
+def save_substrates(path: str, substrates: List["Substrate"], compressed: bool = False) -> None:
+    """
+    Save a population of substrates.
+
+    Names and states must be strings.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    substrates: List[Substrate]
+        The substrates to save.
+    compressed: bool
+        If True, compress the archive.
+    """
+    names, name_codes = _intern(s.name for s in substrates)
+    states, state_codes = _intern(s.state for s in substrates)
+    columns = {"names": names, "name_codes": name_codes, "states": states, "state_codes": state_codes}
+    save_columns(path, "substrates", columns, compressed)
+
+
+def load_substrates(
+    path: str,
+    mmap: bool = False,
+    factory: Callable[[str, str], "Substrate"] = Substrate,
+) -> List["Substrate"]:
+    """
+    Load a population of substrates.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    mmap: bool
+        If True, memory-map the columns instead of reading them.
+    factory: Callable[[str, str], Substrate]
+        Function creating a substrate from a state and a name.
+
+    Returns
+    -------
+    List[Substrate]
+        The substrates.
+    """
+    columns = load_columns(path, "substrates", mmap)
+    names = columns["names"][columns["name_codes"]].tolist()
+    states = columns["states"][columns["state_codes"]].tolist()
+    return [factory(state, name) for state, name in zip(states, names)]
+
+
+def save_tasks(path: str, tasks: List["Task"], compressed: bool = False) -> None:
+    """
+    Save a catalog of tasks.
+
+    Conditions are stored by name and resolved again on load.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    tasks: List[Task]
+        The tasks to save.
+    compressed: bool
+        If True, compress the archive.
+    """
+    names, name_codes = _intern(t.name for t in tasks)
+    conditions, condition_codes, condition_offsets = _ragged(
+        [c.name for c in t.conditions] if t.conditions is not None else None for t in tasks
+    )
+    states, state_codes, state_offsets = _ragged(t.input_states for t in tasks)
+    columns = {
+        "names": names,
+        "name_codes": name_codes,
+        "conditions": conditions,
+        "condition_codes": condition_codes,
+        "condition_offsets": condition_offsets,
+        "states": states,
+        "state_codes": state_codes,
+        "state_offsets": state_offsets,
+    }
+    save_columns(path, "tasks", columns, compressed)
+
+
+def load_tasks(
+    path: str,
+    conditions: Dict[str, "Condition"] = None,
+    mmap: bool = False,
+    factory: Callable[[str, List["Condition"], List[str]], "Task"] = Task,
+) -> List["Task"]:
+    """
+    Load a catalog of tasks.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    conditions: Dict[str, Condition]
+        Conditions by name, used to resolve the tasks' condition names.
+    mmap: bool
+        If True, memory-map the columns instead of reading them.
+    factory: Callable[[str, List[Condition], List[str]], Task]
+        Function creating a task from a name, conditions and input states.
+        Use it to load tasks of a Task subclass.
+
+    Returns
+    -------
+    List[Task]
+        The tasks.
+    """
+    conditions = conditions or {}
+    columns = load_columns(path, "tasks", mmap)
+    names = columns["names"][columns["name_codes"]].tolist()
+    condition_names = _unragged(
+        columns["conditions"], columns["condition_codes"], columns["condition_offsets"]
+    )
+    input_states = _unragged(columns["states"], columns["state_codes"], columns["state_offsets"])
+
+    tasks = []
+    for name, required, states in zip(names, condition_names, input_states):
+        if required is not None:
+            missing = [c for c in required if c not in conditions]
+            if missing:
+                raise KeyError(f"conditions {missing} of task {name!r} were not given")
+            required = [conditions[c] for c in required]
+        tasks.append(factory(name, required, states))
+    return tasks
+
+
+def save_state_graph(path: str, substrate: "ComplexSubstrate", compressed: bool = False) -> None:
+    """
+    Save the state graph, transition weights and current state of a complex
+    substrate.
+
+    States must be strings. Tasks on the edges are stored by name.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    substrate: ComplexSubstrate
+        The substrate to save.
+    compressed: bool
+        If True, compress the archive.
+    """
+    graph = substrate.state_graph
+    states = list(graph.nodes)
+    # Nodes are unique, so the interned table keeps the node order
+    table, _ = _intern(states)
+    index = {state: i for i, state in enumerate(states)}
+    edges = list(graph.edges(data=True))
+    tasks, task_codes = _intern(data["task"].name for _, _, data in edges)
+    columns = {
+        "name": np.array(substrate.name),
+        "states": table,
+        "sources": np.array([index[src] for src, _, _ in edges], dtype=np.int32),
+        "targets": np.array([index[dst] for _, dst, _ in edges], dtype=np.int32),
+        "weights": np.array([data["weight"] for _, _, data in edges], dtype=np.float64),
+        "tasks": tasks,
+        "task_codes": task_codes,
+        "current": np.array(index[substrate.current_state], dtype=np.int32),
+    }
+    save_columns(path, "state_graph", columns, compressed)
+
+
+def load_state_graph(
+    path: str, tasks: Dict[str, "Task"], mmap: bool = False
+) -> "ComplexSubstrate":
+    """
+    Load a complex substrate from its saved state graph.
+
+    Parameters
+    ----------
+    path: str
+        Path of the archive.
+    tasks: Dict[str, Task]
+        Tasks by name, used to resolve the edges' task names.
+    mmap: bool
+        If True, memory-map the columns instead of reading them.
+
+    Returns
+    -------
+    ComplexSubstrate
+        The substrate, in its saved current state.
+    """
+    columns = load_columns(path, "state_graph", mmap)
+    states = columns["states"].tolist()
+    task_names = columns["tasks"][columns["task_codes"]].tolist()
+    edges = list(zip(columns["sources"].tolist(), columns["targets"].tolist()))
+    transitions = {
+        (states[src], states[dst]): tasks[name] for (src, dst), name in zip(edges, task_names)
+    }
+    weights = {
+        (states[src], states[dst]): weight
+        for (src, dst), weight in zip(edges, columns["weights"].tolist())
+    }
+    return ComplexSubstrate(
+        states[int(columns["current"])],
+        states,
+        transitions,
+        name=str(columns["name"]),
+        weights=weights,
+    )
@@ -6,12 +6,39 @@ produce specific transformations. The role of substrates in Constructor Theory
 is crucial because they are the objects that undergo change when a task is performed.
 """
 
+import itertools
+import warnings
 from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
 if TYPE_CHECKING:
+    import scipy.sparse as sp
+
     from constructor.task import Task
 
 import networkx as nx
+import numpy as np
+
+from constructor import trace
+
+
+def state_of(substrate: Any) -> Any:
+    """
+    Get the state of a substrate, or the current state of a complex one.
+
+    Parameters
+    ----------
+    substrate: Substrate
+        A Substrate or ComplexSubstrate.
+
+    Returns
+    -------
+    Any
+        The substrate's state, or None if it has none.
+    """
+    state = getattr(substrate, "state", None)
+    if state is None:
+        state = getattr(substrate, "current_state", None)
+    return state
 
 
 class Substrate:
@@ -77,11 +104,16 @@ class Substrate:
 
 
 class ComplexSubstrate:
+    # Numbers the default names, so unnamed substrates stay distinct in traces
+    _ids = itertools.count(1)
+
     def __init__(
         self,
         initial_state: str,
         possible_states: List[str],
         possible_transitions: Dict[Tuple[str, str], "Task"],
+        name: str = None,
+        weights: Dict[Tuple[str, str], float] = None,
     ):
         """
         Initialize a ComplexSubstrate.
@@ -89,13 +121,36 @@ class ComplexSubstrate:
         :param initial_state: The starting state of the substrate.
         :param possible_states: List of possible states.
         :param possible_transitions: Dictionary representing possible state transitions (as a graph).
+        :param name: Name of the substrate. Defaults to a unique
+            "ComplexSubstrate <n>".
+        :param weights: Optional relative weights of the transitions, used as
+            transition probabilities after normalizing each state's outgoing
+            weights. Transitions without a weight have weight 1.
+        :raises ValueError: If a weight is negative or belongs to a
+            transition that is not in ``possible_transitions``.
         """
+        weights = weights or {}
+        unknown = [edge for edge in weights if edge not in possible_transitions]
+        if unknown:
+            raise ValueError(f"weights given for unknown transitions {unknown}")
+        negative = [edge for edge, weight in weights.items() if not weight >= 0]
+        if negative:
+            raise ValueError(f"transition weights must be non-negative, got {negative}")
+
+        self.name = f"ComplexSubstrate {next(self._ids)}" if name is None else name
         self.state_graph = nx.DiGraph()
         self.state_graph.add_nodes_from(possible_states)
         for (src, dst), task in possible_transitions.items():
-            self.state_graph.add_edge(src, dst, task=task)
+            self.state_graph.add_edge(src, dst, task=task, weight=weights.get((src, dst), 1.0))
         self.current_state = initial_state
 
+    @property
+    def states(self) -> List[str]:
+        """
+        The possible states, in the order used by the transition matrix.
+        """
+        return list(self.state_graph.nodes)
+
     def can_transition(self, task) -> bool:
         """
         Check if the current state can transition using the given task.
@@ -115,9 +170,123 @@ class ComplexSubstrate:
         :param task: Task to perform.
         :return: True if the transition was successful, False otherwise.
         """
+        performed = False
         if self.can_transition(task):
             for neighbor in self.state_graph.neighbors(self.current_state):
                 if self.state_graph[self.current_state][neighbor]["task"] == task:
                     self.current_state = neighbor
-                    return True
-        return False
+                    performed = True
+                    break
+
+        recorder = trace.active()
+        if recorder is not None:
+            recorder.record(trace.TRANSITION, None, task, self, performed)
+        return performed
+
+    def transition_matrix(self) -> "sp.csr_matrix":
+        """
+        Build the sparse Markov transition matrix of the state graph.
+
+        Entry (i, j) is the probability of moving from state i to state j,
+        i.e. the edge weight divided by the total outgoing weight of state i.
+        States without outgoing transitions are absorbing.
+
+        :return: Row-stochastic matrix indexed like ``states``.
+        """
+        # scipy is only needed for the Markov methods, so import it lazily
+        import scipy.sparse as sp
+
+        matrix = sp.csr_matrix(
+            nx.to_scipy_sparse_array(self.state_graph, nodelist=self.states, weight="weight"),
+            dtype=float,
+        )
+        totals = np.asarray(matrix.sum(axis=1)).ravel()
+        absorbing = totals == 0
+        totals[absorbing] = 1.0
+        return sp.csr_matrix(sp.diags(1.0 / totals) @ matrix + sp.diags(absorbing.astype(float)))
+
+    def distribution(self) -> np.ndarray:
+        """
+        Get the distribution concentrated on the current state.
+
+        :return: Probability vector indexed like ``states``.
+        """
+        vector = np.zeros(self.state_graph.number_of_nodes())
+        vector[self.states.index(self.current_state)] = 1.0
+        return vector
+
+    def propagate(self, distribution: np.ndarray = None, steps: int = 1) -> np.ndarray:
+        """
+        Advance a probability distribution over states by a number of steps.
+
+        :param distribution: Probability vector indexed like ``states``.
+            Defaults to the current state.
+        :param steps: Number of transitions to advance.
+        :return: The distribution after ``steps`` transitions.
+        """
+        vector = self.distribution() if distribution is None else np.asarray(distribution, float)
+        transposed = self.transition_matrix().T.tocsr()
+        for _ in range(steps):
+            vector = transposed @ vector
+        return vector
+
+    def stationary_distribution(self) -> np.ndarray:
+        """
+        Solve for the stationary distribution of the transition matrix.
+
+        :return: Probability vector indexed like ``states`` with pi P = pi.
+        :raises ValueError: If the chain has no unique stationary distribution.
+        """
+        import scipy.sparse as sp
+        import scipy.sparse.linalg as spla
+
+        n = self.state_graph.number_of_nodes()
+        # pi (P - I) = 0 with one equation replaced by sum(pi) = 1
+        system = (self.transition_matrix().T - sp.identity(n)).tolil()
+        system[n - 1, :] = np.ones(n)
+        rhs = np.zeros(n)
+        rhs[n - 1] = 1.0
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", spla.MatrixRankWarning)
+            vector = spla.spsolve(system.tocsc(), rhs)
+        if not np.all(np.isfinite(vector)):
+            raise ValueError("the chain has no unique stationary distribution")
+        return vector
+
+    def absorption_probabilities(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Compute the probability of ending in each absorbing state.
+
+        Absorbing states are states the chain can't leave: states without
+        outgoing transitions (or whose outgoing transitions all have weight 0)
+        and states whose only transition is a self-loop.
+
+        :return: The transient states, the absorbing states, and a matrix whose
+            entry (i, j) is the probability that a chain started in transient
+            state i is absorbed in absorbing state j.
+        :raises ValueError: If the chain has no absorbing states, or some
+            transient state can't reach one.
+        """
+        import scipy.sparse as sp
+        import scipy.sparse.linalg as spla
+
+        states = self.states
+        matrix = self.transition_matrix()
+        stays = matrix.diagonal() == 1.0
+        absorbing = [i for i in range(len(states)) if stays[i]]
+        transient = [i for i in range(len(states)) if not stays[i]]
+        if not absorbing:
+            raise ValueError("the chain has no absorbing states")
+
+        q = matrix[transient][:, transient]
+        r = matrix[transient][:, absorbing]
+        # B = (I - Q)^-1 R
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", spla.MatrixRankWarning)
+            probabilities = spla.spsolve(
+                (sp.identity(len(transient)) - q).tocsc(), r.toarray()
+            )
+        probabilities = np.asarray(probabilities).reshape(len(transient), len(absorbing))
+        if not np.all(np.isfinite(probabilities)):
+            raise ValueError("some transient states can't reach an absorbing state")
+        return [states[i] for i in transient], [states[i] for i in absorbing], probabilities
@@ -0,0 +1,306 @@
+"""
+A sweep runs the same simulation model over every point of a parameter space.
+
+For each point, a build function creates the ``Simulation`` (constructors,
+substrates and tasks) and a measure function runs it and returns a result.
+Results are cached on disk under a content hash of the model and the point,
+so points that did not change are skipped when the sweep is run again and an
+interrupted sweep resumes where it stopped. Nothing is built to compute the
+hash.
+
+The model hash covers the source of the build and measure functions and of
+the code they reference: the functions, classes (with their base classes and
+methods) and modules they use through globals and closures, followed
+recursively, plus simple global constants. Standard library and installed
+third-party code is not followed, except this package. Anything else the
+model depends on, such as data files, is not hashed; bump ``version`` when it
+changes.
+"""
+
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import pickle
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List
+
+from constructor.substrate import state_of
+
+if TYPE_CHECKING:
+    from constructor.simulate import Simulation
+
+
+def final_states(simulation: "Simulation") -> List[Any]:
+    """
+    Run a simulation and return the final state of every substrate.
+
+    Parameters
+    ----------
+    simulation: Simulation
+        The simulation to run.
+
+    Returns
+    -------
+    List[Any]
+        The substrate states after the run.
+    """
+    simulation.run()
+    return [state_of(substrate) for substrate in simulation.substrates]
+
+
+def _source(obj: Any) -> str:
+    """
+    Get the source of a function or class, or its qualified name if the
+    source is unavailable.
+    """
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+
+
+def _followed(obj: Any) -> bool:
+    """
+    Check whether an object's code belongs to the model rather than to the
+    standard library or an installed third-party package.
+    """
+    name = obj.__name__ if inspect.ismodule(obj) else getattr(obj, "__module__", None)
+    if not name:
+        return False
+    root = name.split(".")[0]
+    if root == __name__.split(".")[0]:
+        return True
+    if root in sys.stdlib_module_names:
+        return False
+    path = getattr(sys.modules.get(name), "__file__", None) or ""
+    return "site-packages" not in path and "dist-packages" not in path
+
+
+def _referenced(function: types.FunctionType) -> Iterator[Any]:
+    """
+    Yield the globals and closure values a function's code refers to.
+    """
+    codes, names = [function.__code__], []
+    while codes:
+        code = codes.pop()
+        names.extend(code.co_names)
+        codes.extend(c for c in code.co_consts if isinstance(c, types.CodeType))
+    for name in names:
+        if name in function.__globals__:
+            yield name, function.__globals__[name]
+    for name, cell in zip(function.__code__.co_freevars, function.__closure__ or ()):
+        try:
+            yield name, cell.cell_contents
+        except ValueError:
+            continue
+
+
+def _code_sources(*roots: Any) -> List[str]:
+    """
+    Collect the source of functions and the code they reference, recursively.
+    """
+    sources, seen, stack = [], set(), list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or not _followed(obj):
+            continue
+        seen.add(id(obj))
+        sources.append(_source(obj))
+        if inspect.isclass(obj):
+            stack.extend(obj.__bases__)
+            for value in vars(obj).values():
+                if isinstance(value, property):
+                    stack.extend(f for f in (value.fget, value.fset) if f is not None)
+                else:
+                    value = getattr(value, "__func__", value)
+                    if inspect.isfunction(value) or inspect.isclass(value):
+                        stack.append(value)
+        elif inspect.isfunction(obj):
+            for name, value in _referenced(obj):
+                if isinstance(value, (bool, int, float, str, type(None))):
+                    sources.append(f"{name} = {value!r}")
+                elif inspect.isfunction(value) or inspect.isclass(value):
+                    stack.append(value)
+                elif inspect.ismodule(value) and _followed(value):
+                    # Whole modules are hashed but not followed further
+                    seen.add(id(value))
+                    sources.append(_source(value))
+    return sources
+
+
+def _run_point(
+    build: Callable[..., "Simulation"],
+    measure: Callable[["Simulation"], Any],
+    point: Dict[str, Any],
+    path: str,
+) -> Any:
+    result = measure(build(**point))
+    # Write then rename so an interrupted write never leaves a partial entry
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f)
+    os.replace(tmp, path)
+    return result
+
+
+class Sweep:
+    """
+    A parameter sweep over a simulation model with on-disk result caching.
+
+    Attributes
+    ----------
+    build: Callable[..., Simulation]
+        Function called with a point's parameters as keyword arguments that
+        returns the Simulation for that point.
+    space: Dict[str, List[Any]]
+        Values to sweep for each parameter. Every combination is a point.
+    cache_dir: str
+        Directory holding cached results.
+    measure: Callable[[Simulation], Any]
+        Function that runs a Simulation and returns its result.
+    version: str
+        Extra text included in the hash; change it to invalidate the cache
+        after changing anything the hash does not cover.
+
+    Methods
+    -------
+    points() -> List[Dict[str, Any]]
+        Get every point of the parameter space.
+    key(point: Dict[str, Any]) -> str
+        Get the content hash of a point.
+    pending() -> List[Dict[str, Any]]
+        Get the points without a cached result.
+    run(workers: int = None) -> List[Any]
+        Run every uncached point and return the results of all points.
+    """
+
+    def __init__(
+        self,
+        build: Callable[..., "Simulation"],
+        space: Dict[str, List[Any]],
+        cache_dir: str,
+        measure: Callable[["Simulation"], Any] = final_states,
+        version: str = "",
+    ) -> None:
+        """
+        Initialize a Sweep.
+
+        Parameters
+        ----------
+        build: Callable[..., Simulation]
+            Function called with a point's parameters as keyword arguments
+            that returns the Simulation for that point. Must be defined at
+            module level to run points in worker processes.
+        space: Dict[str, List[Any]]
+            Values to sweep for each parameter. Values must be JSON
+            serializable.
+        cache_dir: str
+            Directory holding cached results. Created if missing.
+        measure: Callable[[Simulation], Any]
+            Function that runs a Simulation and returns its (picklable)
+            result. Defaults to the final substrate states.
+        version: str
+            Extra text included in the hash; change it to invalidate the cache
+            after changing anything the hash does not cover, such as data
+            files.
+        """
+        self.build = build
+        self.space = space
+        self.cache_dir = cache_dir
+        self.measure = measure
+        self.version = version
+        os.makedirs(cache_dir, exist_ok=True)
+        self._model = self._fingerprint()
+
+    def points(self) -> List[Dict[str, Any]]:
+        """
+        Get every point of the parameter space.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            One dictionary of parameters per combination of values.
+        """
+        names = list(self.space)
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(self.space[name] for name in names))
+        ]
+
+    def key(self, point: Dict[str, Any]) -> str:
+        """
+        Get the content hash of a point.
+
+        The hash covers the source of the build and measure functions and
+        the code they reference, the version and the point's parameters.
+
+        Parameters
+        ----------
+        point: Dict[str, Any]
+            The point's parameters.
+
+        Returns
+        -------
+        str
+            Hex digest identifying the point's result.
+        """
+        config = json.dumps({"model": self._model, "point": point}, sort_keys=True)
+        return hashlib.sha256(config.encode()).hexdigest()
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """
+        Get the points without a cached result.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The points that still need to be run.
+        """
+        return [p for p in self.points() if not os.path.exists(self._path(p))]
+
+    def run(self, workers: int = None) -> List[Any]:
+        """
+        Run every uncached point and return the results of all points.
+
+        Each result is written to the cache as soon as its point finishes.
+
+        Parameters
+        ----------
+        workers: int
+            Number of worker processes. Defaults to the number of CPUs; 1
+            runs every point in this process.
+
+        Returns
+        -------
+        List[Any]
+            The result of each point, in the order of ``points()``.
+        """
+        pending = self.pending()
+        if workers == 1:
+            for point in pending:
+                _run_point(self.build, self.measure, point, self._path(point))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(_run_point, self.build, self.measure, p, self._path(p))
+                    for p in pending
+                ]
+                for future in futures:
+                    future.result()
+
+        results = []
+        for point in self.points():
+            with open(self._path(point), "rb") as f:
+                results.append(pickle.load(f))
+        return results
+
+    def _path(self, point: Dict[str, Any]) -> str:
+        return os.path.join(self.cache_dir, f"{self.key(point)}.pkl")
+
+    def _fingerprint(self) -> str:
+        parts = [self.version] + _code_sources(self.build, self.measure)
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
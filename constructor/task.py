@@ -6,9 +6,12 @@ A task describes the change from one state to another and is central to
 understanding what is possible or impossible in a given physical system.
 """
 
+import asyncio
 from functools import wraps
 from typing import TYPE_CHECKING, Callable, List, Union
 
+from constructor.substrate import state_of
+
 if TYPE_CHECKING:
     from constructor.condition import Condition
     from constructor.substrate import Substrate
@@ -25,11 +28,17 @@ class Task:
         Name of the task.
     conditions: List[Condition]
         Optional conditions that must be met for the task to be performed.
+    input_states: List[str]
+        Optional substrate states the task applies to. None means any state.
 
     Methods
     -------
+    applies_to(state: str) -> bool
+        Check if the task applies to a substrate in the given state.
     is_possible(substrate: Substrate) -> bool
         Check if the task can be performed on the given substrate.
+    ais_possible(substrate: Substrate) -> bool
+        Asynchronously check if the task can be performed on the given substrate.
     execute(substrate: Substrate) -> Union[Substrate, bool]
         Perform the task on the substrate, changing its state if possible.
     """
@@ -38,6 +47,7 @@ class Task:
         self,
         name: str,
         conditions: List["Condition"] = None,
+        input_states: List[str] = None,
     ) -> None:
         """
         Initialize a Task.
@@ -48,9 +58,28 @@ class Task:
             Name of the task.
         conditions: List[Condition]
             Optional conditions that must be met for the task to be performed.
+        input_states: List[str]
+            Optional substrate states the task applies to. None means any state.
         """
         self.name = name
         self.conditions = conditions
+        self.input_states = input_states
+
+    def applies_to(self, state: str) -> bool:
+        """
+        Check if the task applies to a substrate in the given state.
+
+        Parameters
+        ----------
+        state: str
+            The substrate state.
+
+        Returns
+        -------
+        bool
+            True if the task applies to the state, False otherwise.
+        """
+        return self.input_states is None or state in self.input_states
 
     def is_possible(self, substrate: "Substrate") -> bool:
         """
@@ -66,9 +95,35 @@ class Task:
         bool
             True if the task can be performed, False otherwise.
         """
+        if self.input_states is not None and not self.applies_to(state_of(substrate)):
+            return False
 
         return all(condition.check(substrate) for condition in self.conditions)
 
+    async def ais_possible(self, substrate: "Substrate") -> bool:
+        """
+        Asynchronously check if the task can be performed on the given substrate.
+
+        All conditions are checked concurrently.
+
+        Parameters
+        ----------
+        substrate: Substrate
+            The substrate on which the task is to be performed.
+
+        Returns
+        -------
+        bool
+            True if the task can be performed, False otherwise.
+        """
+        if self.input_states is not None and not self.applies_to(state_of(substrate)):
+            return False
+
+        results = await asyncio.gather(
+            *(condition.acheck(substrate) for condition in self.conditions or [])
+        )
+        return all(results)
+
     @classmethod
     def execute(cls) -> Callable[["Substrate"], Union["Substrate", bool]]:
         """
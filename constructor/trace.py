@@ -0,0 +1,294 @@
+"""
+A trace records which constructor performed which task on which substrate,
+and with what outcome, without keeping any Python objects alive.
+
+Events are fixed-width integer records. Constructor, task and substrate names
+are interned to integer ids; the records are buffered in a NumPy array and
+flushed to disk as zlib-compressed chunks. Each chunk header lists the
+substrate and task ids it contains, so a reader can skip chunks that do not
+match a filter without decompressing them.
+
+Recording is opt-in: events are only recorded inside ``recording``. The
+active recorder is inherited by threads started with ``asyncio.to_thread``, so
+recorders are thread-safe.
+"""
+
+import json
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+#: Event kinds
+PERFORM = 0
+TRANSITION = 1
+
+#: Layout of one event record
+RECORD = np.dtype(
+    [
+        ("event", "<u1"),
+        ("outcome", "<u1"),
+        ("constructor", "<i4"),
+        ("task", "<i4"),
+        ("substrate", "<i4"),
+    ]
+)
+
+# magic, records, names bytes, substrate ids, task ids, payload bytes
+_HEADER = struct.Struct("<4sIIIII")
+_MAGIC = b"TRC1"
+
+_active: ContextVar[Optional["TraceRecorder"]] = ContextVar("constructor_trace", default=None)
+
+
+class TraceRecorder:
+    """
+    Records events to a compressed trace file.
+
+    Attributes
+    ----------
+    path: str
+        Path of the trace file.
+    chunk_size: int
+        Number of events buffered before a chunk is written.
+    names: Dict[str, int]
+        Interned names and their ids.
+
+    Methods
+    -------
+    record(event: int, constructor: Any, task: Any, substrate: Any, outcome: Any) -> None
+        Record an event.
+    flush() -> None
+        Write the buffered events as a compressed chunk.
+    close() -> None
+        Flush the remaining events and close the file.
+    """
+
+    def __init__(self, path: str, chunk_size: int = 65536, level: int = 6) -> None:
+        """
+        Initialize a TraceRecorder, truncating any existing file.
+
+        Parameters
+        ----------
+        path: str
+            Path of the trace file.
+        chunk_size: int
+            Number of events buffered before a chunk is written.
+        level: int
+            zlib compression level.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.level = level
+        self.names: Dict[str, int] = {}
+        self._new_names: List[str] = []
+        self._buffer = np.empty(chunk_size, dtype=RECORD)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(self, event: int, constructor: Any, task: Any, substrate: Any, outcome: Any) -> None:
+        """
+        Record an event.
+
+        Parameters
+        ----------
+        event: int
+            ``PERFORM`` or ``TRANSITION``.
+        constructor: Constructor
+            The constructor, or None for transitions.
+        task: Task
+            The task.
+        substrate: Substrate
+            The substrate.
+        outcome: Any
+            Whether the event succeeded; stored as 0 or 1.
+        """
+        with self._lock:
+            self._buffer[self._count] = (
+                event,
+                bool(outcome),
+                -1 if constructor is None else self._intern(constructor.name),
+                self._intern(task.name),
+                self._intern(substrate.name),
+            )
+            self._count += 1
+            if self._count == self.chunk_size:
+                self._flush()
+
+    def flush(self) -> None:
+        """
+        Write the buffered events as a compressed chunk.
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        """
+        Flush the remaining events and close the file.
+        """
+        with self._lock:
+            if not self._file.closed:
+                self._flush()
+                self._file.close()
+
+    def _flush(self) -> None:
+        if self._count == 0 and not self._new_names:
+            return
+        records = self._buffer[: self._count]
+        names = json.dumps(self._new_names).encode() if self._new_names else b""
+        substrates = np.unique(records["substrate"]).astype("<i4")
+        tasks = np.unique(records["task"]).astype("<i4")
+        payload = zlib.compress(records.tobytes(), self.level)
+        self._file.write(
+            _HEADER.pack(_MAGIC, self._count, len(names), len(substrates), len(tasks), len(payload))
+        )
+        self._file.write(names)
+        self._file.write(substrates.tobytes())
+        self._file.write(tasks.tobytes())
+        self._file.write(payload)
+        self._file.flush()
+        self._new_names = []
+        self._count = 0
+
+    def _intern(self, name: str) -> int:
+        index = self.names.get(name)
+        if index is None:
+            index = self.names[name] = len(self.names)
+            self._new_names.append(name)
+        return index
+
+
+class TraceReader:
+    """
+    Reads events from a trace file.
+
+    Attributes
+    ----------
+    path: str
+        Path of the trace file.
+    names: List[str]
+        Interned names, indexed by id.
+
+    Methods
+    -------
+    read(substrate: str = None, task: str = None) -> np.ndarray
+        Read the events, optionally filtered by substrate and task name.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize a TraceReader and index the chunks of the file.
+
+        Parameters
+        ----------
+        path: str
+            Path of the trace file.
+        """
+        self.path = path
+        self.names: List[str] = []
+        self._chunks = []
+        with open(path, "rb") as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if not header:
+                    break
+                magic, count, names, n_substrates, n_tasks, size = _HEADER.unpack(header)
+                if magic != _MAGIC:
+                    raise ValueError(f"{path} is not a trace file")
+                if names:
+                    self.names.extend(json.loads(f.read(names)))
+                substrates = set(np.frombuffer(f.read(4 * n_substrates), dtype="<i4").tolist())
+                tasks = set(np.frombuffer(f.read(4 * n_tasks), dtype="<i4").tolist())
+                self._chunks.append((f.tell(), size, substrates, tasks))
+                f.seek(size, 1)
+
+    def read(self, substrate: str = None, task: str = None) -> np.ndarray:
+        """
+        Read the events, optionally filtered by substrate and task name.
+
+        Chunks without a matching substrate or task are skipped without
+        being decompressed.
+
+        Parameters
+        ----------
+        substrate: str
+            Only return events on the substrate with this name.
+        task: str
+            Only return events of the task with this name.
+
+        Returns
+        -------
+        np.ndarray
+            The matching records, in the order they were recorded.
+        """
+        ids = {name: i for i, name in enumerate(self.names)}
+        substrate_id = None if substrate is None else ids.get(substrate, -2)
+        task_id = None if task is None else ids.get(task, -2)
+
+        parts = [np.empty(0, dtype=RECORD)]
+        with open(self.path, "rb") as f:
+            for offset, size, substrates, tasks in self._chunks:
+                if substrate_id is not None and substrate_id not in substrates:
+                    continue
+                if task_id is not None and task_id not in tasks:
+                    continue
+                f.seek(offset)
+                records = np.frombuffer(zlib.decompress(f.read(size)), dtype=RECORD)
+                mask = np.ones(len(records), dtype=bool)
+                if substrate_id is not None:
+                    mask &= records["substrate"] == substrate_id
+                if task_id is not None:
+                    mask &= records["task"] == task_id
+                parts.append(records[mask])
+        return np.concatenate(parts)
+
+
+@contextmanager
+def recording(path: str, chunk_size: int = 65536, level: int = 6) -> Iterator[TraceRecorder]:
+    """
+    Record constructor and transition events to a trace file within a block.
+
+    Parameters
+    ----------
+    path: str
+        Path of the trace file.
+    chunk_size: int
+        Number of events buffered before a chunk is written.
+    level: int
+        zlib compression level.
+
+    Yields
+    ------
+    TraceRecorder
+        The active recorder.
+    """
+    recorder = TraceRecorder(path, chunk_size, level)
+    token = _active.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _active.reset(token)
+        recorder.close()
+
+
+def active() -> Optional[TraceRecorder]:
+    """
+    Get the active recorder.
+
+    Returns
+    -------
+    Optional[TraceRecorder]
+        The recorder of the enclosing ``recording`` block, or None.
+    """
+    return _active.get()
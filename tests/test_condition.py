@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 from unittest.mock import Mock
 from constructor.condition import Condition
@@ -23,5 +24,16 @@ class TestCondition(unittest.TestCase):
         mock_substrate.get_property.return_value = "wrong"
         self.assertFalse(has_property.check(mock_substrate))
 
+    def test_acheck(self):
+        mock_substrate = Mock(spec=Substrate)
+
+        async def check(s):
+            return True
+
+        self.assertTrue(asyncio.run(Condition("Async", check).acheck(mock_substrate)))
+        self.assertFalse(asyncio.run(Condition("Sync", lambda s: False).acheck(mock_substrate)))
+        with self.assertRaises(TypeError):
+            Condition("Async", check).check(mock_substrate)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,7 @@
+import asyncio
 import unittest
 from unittest.mock import Mock
+from constructor.condition import Condition
 from constructor.main import Constructor
 from constructor.task import Task
 from constructor.substrate import Substrate
@@ -36,5 +38,35 @@ class TestConstructor(unittest.TestCase):
         self.assertFalse(self.constructor.perform(unknown_task, mock_substrate))
         unknown_task.execute.assert_not_called()
 
+    def test_aperform(self):
+        mock_substrate = Mock(spec=Substrate)
+
+        self.task1.execute.return_value = True
+        self.assertTrue(asyncio.run(self.constructor.aperform(self.task1, mock_substrate)))
+        self.task1.execute.assert_called_once_with(mock_substrate)
+
+        unknown_task = Mock(spec=Task)
+        unknown_task.name = "Unknown Task"
+        self.assertFalse(asyncio.run(self.constructor.aperform(unknown_task, mock_substrate)))
+        unknown_task.execute.assert_not_called()
+
+    def test_aperform_async_task_awaits_conditions(self):
+        async def never(substrate):
+            return False
+
+        class Guarded(Task):
+            async def execute(self, substrate):
+                if not await self.ais_possible(substrate):
+                    return False
+                substrate.state = "done"
+                return True
+
+        task = Guarded("Guarded Task", [Condition("Never", never)])
+        constructor = Constructor("Constructor", [task])
+        substrate = Substrate("new", "Substrate")
+
+        self.assertFalse(asyncio.run(constructor.aperform(task, substrate)))
+        self.assertEqual(substrate.state, "new")
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
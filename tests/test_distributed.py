@@ -0,0 +1,40 @@
+import unittest
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from constructor.distributed import DistributedGrid
+from constructor.grid import Grid
+from tests.test_grid import Life
+
+class TestDistributedGrid(unittest.TestCase):
+    def test_step_matches_grid(self):
+        rng = np.random.default_rng(0)
+        array = rng.random((23, 17)) < 0.35
+        grid = Grid.filled(23, 17, "dead")
+        for row, col in zip(*np.nonzero(array)):
+            grid.set_state(row, col, "alive")
+
+        task = Life()
+        with DistributedGrid.from_grid(grid, workers=3) as distributed:
+            for generations in (1, 4):
+                for _ in range(generations):
+                    grid.step(task)
+                distributed.step(task, generations)
+                expected = np.array([[cell.state == "alive" for cell in row] for row in grid.cells])
+                np.testing.assert_array_equal(distributed.array(), expected)
+
+    def test_worker_failure_releases_resources(self):
+        distributed = DistributedGrid(np.zeros((8, 8)), workers=2)
+        name = distributed._shm.name
+        distributed._processes[0].kill()
+        distributed._processes[0].join()
+
+        with self.assertRaises(RuntimeError):
+            distributed.step(Life())
+        distributed.close()
+
+        self.assertFalse(any(p.is_alive() for p in distributed._processes))
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=name)
+
+if __name__ == '__main__':
+    unittest.main()
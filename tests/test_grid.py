@@ -0,0 +1,83 @@
+import unittest
+from constructor.grid import Grid, SparseGrid
+from constructor.rng import RandomStreams
+from constructor.task import Task
+
+class Life(Task):
+    def __init__(self):
+        super().__init__("Life")
+
+    def execute(self, cell, neighbors):
+        alive = sum(1 for n in neighbors if n.state == "alive")
+        if cell.state == "alive":
+            return "alive" if alive in (2, 3) else "dead"
+        return "alive" if alive == 3 else "dead"
+
+def states(grid):
+    return [[cell.state for cell in row] for row in grid.cells]
+
+class TestGrid(unittest.TestCase):
+    def setUp(self):
+        self.task = Life()
+        self.grid = Grid.filled(5, 5, "dead")
+        for col in (1, 2, 3):
+            self.grid.set_state(2, col, "alive")
+
+    def test_random_is_reproducible(self):
+        first = Grid.random(6, 6, 0.5, RandomStreams(1).stream("grid"))
+        second = Grid.random(6, 6, 0.5, RandomStreams(1).stream("grid"))
+        self.assertEqual(states(first), states(second))
+
+    def test_neighbors(self):
+        corner = self.grid.neighbors(0, 0)
+        self.assertEqual(len(corner), 8)
+        self.assertEqual([n.state for n in corner[:5]], ["dead"] * 5)
+        self.assertIs(corner[7], self.grid.cells[1][1])
+        self.assertEqual(len(self.grid.neighbors(2, 2)), 8)
+
+    def test_step_blinker(self):
+        changed = self.grid.step(self.task)
+        self.assertEqual(sorted(changed), [(1, 2), (2, 1), (2, 3), (3, 2)])
+        self.assertEqual([row[2] for row in states(self.grid)], ["dead", "alive", "alive", "alive", "dead"])
+
+    def test_incremental_matches_full(self):
+        full = Grid.filled(5, 5, "dead")
+        for col in (1, 2, 3):
+            full.set_state(2, col, "alive")
+        for _ in range(4):
+            self.grid.step(self.task, incremental=True)
+            full.step(self.task)
+            self.assertEqual(states(self.grid), states(full))
+
+    def test_incremental_still_life_goes_idle(self):
+        grid = Grid.filled(4, 4, "dead")
+        for row, col in [(1, 1), (1, 2), (2, 1), (2, 2)]:
+            grid.set_state(row, col, "alive")
+        self.assertEqual(grid.step(self.task, incremental=True), [])
+        self.assertEqual(grid.dirty, {})
+
+class TestSparseGrid(unittest.TestCase):
+    def test_set_state_drops_default(self):
+        grid = SparseGrid("dead")
+        grid.set_state(5, -3, "alive")
+        self.assertEqual(grid.get_state(5, -3), "alive")
+        grid.set_state(5, -3, "dead")
+        self.assertEqual(len(grid), 0)
+
+    def test_step_matches_dense_grid(self):
+        dense = Grid.filled(8, 8, "dead")
+        sparse = SparseGrid("dead")
+        for row, col in [(3, 3), (3, 4), (3, 5), (2, 5), (1, 4)]:
+            dense.set_state(row, col, "alive")
+            sparse.set_state(row, col, "alive")
+        for _ in range(4):
+            dense.step(Life())
+            sparse.step(Life())
+        expected = {
+            (i, j): "alive" for i, row in enumerate(states(dense))
+            for j, state in enumerate(row) if state == "alive"
+        }
+        self.assertEqual(sparse.cells, expected)
+
+if __name__ == '__main__':
+    unittest.main()
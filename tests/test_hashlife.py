@@ -0,0 +1,42 @@
+import random
+import unittest
+from constructor.grid import SparseGrid
+from constructor.hashlife import HashLife
+from constructor.task import Task
+from tests.test_grid import Life
+
+GLIDER = {(0, 1): "alive", (1, 2): "alive", (2, 0): "alive", (2, 1): "alive", (2, 2): "alive"}
+
+class TestHashLife(unittest.TestCase):
+    def test_from_task(self):
+        engine = HashLife.from_task(Life())
+        self.assertEqual(engine.birth, {3})
+        self.assertEqual(engine.survive, {2, 3})
+
+    def test_from_task_rejects_non_totalistic(self):
+        class North(Task):
+            def execute(self, cell, neighbors):
+                return neighbors[1].state
+        with self.assertRaises(ValueError):
+            HashLife.from_task(North("North"))
+
+    def test_advance_matches_stepping(self):
+        rng = random.Random(0)
+        cells = {(rng.randrange(16), rng.randrange(16)): "alive" for _ in range(80)}
+        stepped = SparseGrid(cells=cells)
+        advanced = SparseGrid(cells=cells)
+        engine = HashLife([3], [2, 3])
+        for generations in (1, 2, 5, 11):
+            for _ in range(generations):
+                stepped.step(Life())
+            engine.advance(advanced, generations)
+            self.assertEqual(advanced.cells, stepped.cells)
+
+    def test_advance_many_generations(self):
+        grid = SparseGrid(cells=GLIDER)
+        HashLife([3], [2, 3]).advance(grid, 4 * 10**9)
+        shifted = {(r + 10**9, c + 10**9): s for (r, c), s in GLIDER.items()}
+        self.assertEqual(grid.cells, shifted)
+
+if __name__ == '__main__':
+    unittest.main()
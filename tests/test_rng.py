@@ -0,0 +1,36 @@
+import pickle
+import unittest
+import numpy as np
+from constructor import rng
+from constructor.rng import RandomStreams
+
+class TestRandomStreams(unittest.TestCase):
+    def test_same_seed_and_key_reproduce(self):
+        first = RandomStreams(42)
+        second = RandomStreams(42)
+        second.stream("worker", 1).random(5)  # requesting other keys first has no effect
+        np.testing.assert_array_equal(
+            first.stream("substrate", 3).random(10), second.stream("substrate", 3).random(10)
+        )
+
+    def test_keys_are_independent(self):
+        streams = RandomStreams(42)
+        self.assertFalse(np.array_equal(streams.stream(0).random(5), streams.stream(1).random(5)))
+
+    def test_stream_continues(self):
+        streams = RandomStreams(7)
+        draws = np.concatenate([streams.stream("a").random(3), streams.stream("a").random(3)])
+        np.testing.assert_array_equal(draws, RandomStreams(7).stream("a").random(6))
+
+    def test_pickle_keeps_seed(self):
+        streams = pickle.loads(pickle.dumps(RandomStreams(3)))
+        np.testing.assert_array_equal(streams.stream("x").random(3), RandomStreams(3).stream("x").random(3))
+
+    def test_use_sets_current(self):
+        streams = RandomStreams(5)
+        with streams.use("a") as generator:
+            self.assertIs(rng.current(), generator)
+        self.assertIsNot(rng.current(), generator)
+
+if __name__ == '__main__':
+    unittest.main()
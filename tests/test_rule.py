@@ -0,0 +1,124 @@
+import unittest
+import numpy as np
+from constructor.grid import Grid, SparseGrid
+from constructor.rng import RandomStreams
+from constructor.rule import RuleTable, life_like
+from constructor.substrate import Substrate
+from constructor.task import Task
+from tests.test_grid import Life, states
+
+class North(Task):
+    def execute(self, cell, neighbors):
+        return neighbors[1].state
+
+class Parity(Task):
+    def execute(self, cell, neighbors):
+        total = sum(n.state == "on" for n in neighbors) + (cell.state == "on")
+        return "on" if total % 2 else "off"
+
+class BriansBrain(Task):
+    def execute(self, cell, neighbors):
+        if cell.state == "on":
+            return "dying"
+        if cell.state == "dying":
+            return "off"
+        return "on" if sum(n.state == "on" for n in neighbors) == 2 else "off"
+
+def brians_brain(state, counts):
+    if state == "on":
+        return "dying"
+    if state == "dying":
+        return "off"
+    return "on" if counts["on"] == 2 else "off"
+
+class TestRuleTable(unittest.TestCase):
+    def test_compile_life(self):
+        rule = RuleTable.compile(Life(), ["dead", "alive"])
+        self.assertEqual(rule.kind, "outer_totalistic")
+        np.testing.assert_array_equal(rule.table, RuleTable.life_like([3], [2, 3]).table)
+        self.assertEqual(life_like(rule), ({3}, {2, 3}))
+
+    def test_compile_totalistic(self):
+        rule = RuleTable.compile(Parity("Parity"), ["off", "on"], "von_neumann")
+        self.assertEqual(rule.kind, "totalistic")
+        self.assertEqual(rule.table.tolist(), [0, 1, 0, 1, 0, 1])
+
+    def test_compile_full(self):
+        rule = RuleTable.compile(North("North"), ["dead", "alive"])
+        self.assertEqual(rule.kind, "full")
+        codes = np.zeros((4, 4), dtype=int)
+        codes[1, 2] = 1
+        expected = np.zeros((4, 4), dtype=int)
+        expected[2, 2] = 1
+        np.testing.assert_array_equal(rule.apply(codes), expected)
+        with self.assertRaises(ValueError):
+            life_like(rule)
+
+    def test_compile_rejects_unknown_state(self):
+        with self.assertRaises(ValueError):
+            RuleTable.compile(Life(), ["off", "on"])
+
+    def test_declared_matches_compiled(self):
+        states_ = ["off", "on", "dying"]
+        declared = RuleTable.outer_totalistic(states_, brians_brain)
+        compiled = RuleTable.compile(BriansBrain("Brian's Brain"), states_)
+        self.assertEqual(compiled.kind, "outer_totalistic")
+        np.testing.assert_array_equal(declared.table, compiled.table)
+
+    def test_apply_matches_grid(self):
+        rng = RandomStreams(0).stream("grid")
+        grid = Grid.random(12, 10, 0.4, rng)
+        rule = RuleTable.life_like([3], [2, 3])
+        codes = np.array([[rule.index[c.state] for c in row] for row in grid.cells])
+        for _ in range(5):
+            grid.step(Life())
+        np.testing.assert_array_equal(
+            rule.apply(codes, generations=5),
+            [[rule.index[s] for s in row] for row in states(grid)],
+        )
+
+    def test_grid_step_with_table(self):
+        rng = RandomStreams(1).stream("grid")
+        grid = Grid.random(8, 8, 0.4, rng)
+        expected = Grid.random(8, 8, 0.4, RandomStreams(1).stream("grid"))
+        rule = RuleTable.compile(Life(), ["dead", "alive"])
+        for _ in range(3):
+            self.assertEqual(sorted(grid.step(rule)), sorted(expected.step(Life())))
+        self.assertEqual(states(grid), states(expected))
+
+    def test_grid_edges_match_table(self):
+        grid = Grid.filled(3, 3, "dead")
+        grid.set_state(0, 1, "alive")
+        grid.set_state(2, 2, "alive")
+        compiled = Grid.filled(3, 3, "dead")
+        compiled.set_state(0, 1, "alive")
+        compiled.set_state(2, 2, "alive")
+        rule = RuleTable.compile(North("North"), ["dead", "alive"])
+        for _ in range(3):
+            grid.step(North("North"))
+            compiled.step(rule)
+            self.assertEqual(states(grid), states(compiled))
+
+    def test_execute(self):
+        rule = RuleTable.outer_totalistic(["off", "on", "dying"], brians_brain)
+        on, off = Substrate("on", "Cell"), Substrate("off", "Cell")
+        self.assertEqual(rule.execute(off, [on, on] + [off] * 6), "on")
+        self.assertEqual(rule.execute(on, [off] * 8), "dying")
+        with self.assertRaises(ValueError):
+            rule.execute(off, [on, on, off])
+
+    def test_sparse_grid_uses_table_neighborhood(self):
+        rule = RuleTable.compile(Parity("Parity"), ["off", "on"], "von_neumann")
+        sparse = SparseGrid("off", {(2, 2): "on"})
+        grid = Grid.filled(5, 5, "off")
+        grid.set_state(2, 2, "on")
+        sparse.step(rule)
+        grid.step(rule)
+        self.assertEqual(
+            sparse.cells,
+            {(i, j): "on" for i, row in enumerate(states(grid)) for j, s in enumerate(row) if s == "on"},
+        )
+        self.assertNotIn((1, 1), sparse.cells)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
+import asyncio
 import unittest
 from unittest.mock import Mock, patch
+from constructor import rng
+from constructor.condition import Condition
 from constructor.simulate import Simulation
 from constructor.main import Constructor
-from constructor.substrate import Substrate
+from constructor.substrate import ComplexSubstrate, Substrate
 from constructor.task import Task
 
 class TestSimulation(unittest.TestCase):
@@ -49,5 +52,144 @@ class TestSimulation(unittest.TestCase):
         mock_print.assert_any_call("Constructor 2 could not perform Task 1 on Substrate 2")
         mock_print.assert_any_call("Constructor 2 could not perform Task 2 on Substrate 2")
 
+    def test_dispatch(self):
+        task1 = Task("Task 1", [], ["a"])
+        task2 = Task("Task 2", [], ["b"])
+        constructor1 = Constructor("Constructor 1", [task1])
+        constructor2 = Constructor("Constructor 2", [task1, task2])
+        substrate = Substrate("b", "Substrate")
+        simulation = Simulation([constructor1, constructor2], [substrate], [task1, task2])
+
+        self.assertEqual(
+            simulation.dispatch,
+            [(constructor1, task1), (constructor2, task1), (constructor2, task2)],
+        )
+        self.assertEqual(simulation.viable(substrate), [(constructor2, task2)])
+
+        substrate.state = "c"
+        self.assertEqual(simulation.viable(substrate), [])
+
+    def test_step_only_evaluates_dirty(self):
+        task = Task("Flip", [], ["off"])
+        task.execute = lambda substrate: setattr(substrate, "state", "on") or True
+        constructor = Constructor("Constructor", [task])
+        substrate1 = Substrate("off", "Substrate 1")
+        substrate2 = Substrate("on", "Substrate 2")
+        simulation = Simulation(
+            [constructor], [substrate1, substrate2], [task],
+            neighbors=lambda s: [substrate2] if s is substrate1 else [],
+        )
+
+        self.assertEqual(simulation.step(), [substrate1])
+        self.assertEqual(list(simulation.dirty), [substrate1, substrate2])
+        self.assertEqual(simulation.step(), [])
+        self.assertEqual(simulation.dirty, {})
+
+    @patch('builtins.print')
+    def test_run_follows_state_changes(self, mock_print):
+        task1 = Task("Task 1", [], ["a"])
+        task1.execute = lambda substrate: setattr(substrate, "state", "b") or True
+        task2 = Task("Task 2", [], ["b"])
+        task2.execute = lambda substrate: setattr(substrate, "state", "c") or True
+        constructor = Constructor("Constructor", [task1, task2])
+        substrate = Substrate("a", "Substrate")
+
+        Simulation([constructor], [substrate], [task1, task2]).run()
+
+        self.assertEqual(substrate.state, "c")
+
+    def test_step_complex_substrate(self):
+        task = Task("Advance", [])
+        substrate = ComplexSubstrate("a", ["a", "b"], {("a", "b"): task})
+        task.execute = lambda s: s.perform_transition(task)
+        constructor = Constructor("Constructor", [task])
+        simulation = Simulation([constructor], [substrate], [task])
+
+        self.assertEqual(simulation.step(), [substrate])
+        self.assertEqual(substrate.current_state, "b")
+
+    @patch('builtins.print')
+    def test_arun_complex_substrate_with_input_states(self, mock_print):
+        class Advance(Task):
+            def execute(self, substrate):
+                return self.is_possible(substrate) and substrate.perform_transition(self)
+
+        task = Advance("Advance", [], ["A"])
+        substrate = ComplexSubstrate("A", ["A", "B"], {("A", "B"): task})
+        constructor = Constructor("Constructor", [task])
+
+        asyncio.run(Simulation([constructor], [substrate], [task]).arun())
+        self.assertEqual(substrate.current_state, "B")
+
+    @patch('builtins.print')
+    def test_arun(self, mock_print):
+        self.constructor1.aperform.return_value = True
+        self.constructor2.aperform.return_value = False
+
+        asyncio.run(self.simulation.arun(concurrency=2))
+
+        self.assertEqual(self.constructor1.aperform.await_count, 4)
+        self.assertEqual(self.constructor2.aperform.await_count, 4)
+        mock_print.assert_any_call("Constructor 1 successfully performed Task 2 on Substrate 2")
+        mock_print.assert_any_call("Constructor 2 could not perform Task 1 on Substrate 1")
+
+    @patch('builtins.print')
+    def test_seeded_runs_are_reproducible(self, mock_print):
+        task = Task("Draw", [])
+        task.execute = lambda substrate: setattr(substrate, "state", rng.current().random()) or True
+        constructor = Constructor("Constructor", [task])
+
+        def states(run):
+            substrates = [Substrate(None, f"Substrate {i}") for i in range(5)]
+            run(Simulation([constructor], substrates, [task], seed=11))
+            return [s.state for s in substrates]
+
+        serial = states(lambda simulation: simulation.run())
+        self.assertEqual(states(lambda simulation: asyncio.run(simulation.arun(concurrency=3))), serial)
+        self.assertEqual(len(set(serial)), 5)
+
+    @patch('builtins.print')
+    def test_streams_for_new_substrates(self, mock_print):
+        task = Task("Draw", [])
+        task.execute = lambda substrate: setattr(substrate, "state", rng.current().random()) or True
+        constructor = Constructor("Constructor", [task])
+        substrate1 = Substrate(None, "Substrate 1")
+        substrate2 = Substrate(None, "Substrate 2")
+        simulation = Simulation(
+            [constructor], [substrate1], [task],
+            neighbors=lambda s: [substrate2] if s is substrate1 else [],
+            seed=3,
+        )
+
+        simulation.step()
+        simulation.step()
+        self.assertIsNotNone(substrate2.state)
+
+        substrate3 = Substrate(None, "Substrate 3")
+        simulation.substrates.append(substrate3)
+        simulation.run()
+        self.assertEqual(len({substrate1.state, substrate2.state, substrate3.state}), 3)
+
+    @patch('builtins.print')
+    def test_conditioned_runs_are_reproducible(self, mock_print):
+        class Guarded(Task):
+            def execute(self, substrate):
+                if not self.is_possible(substrate):
+                    return False
+                substrate.state = "set"
+                return True
+
+        task = Guarded("Guarded", [Condition("Lucky", lambda s: rng.current().random() < 0.5)])
+        constructor = Constructor("Constructor", [task])
+
+        def states(run):
+            substrates = [Substrate("x", f"Substrate {i}") for i in range(6)]
+            run(Simulation([constructor], substrates, [task], seed=1))
+            return [s.state for s in substrates]
+
+        serial = states(lambda simulation: simulation.run())
+        self.assertEqual(states(lambda simulation: asyncio.run(simulation.arun(concurrency=3))), serial)
+        self.assertEqual(set(serial), {"x", "set"})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from constructor.condition import Condition
+from constructor.storage import (
+    load_columns,
+    load_state_graph,
+    load_substrates,
+    load_tasks,
+    save_state_graph,
+    save_substrates,
+    save_tasks,
+)
+from constructor.substrate import ComplexSubstrate, Substrate
+from constructor.task import Task
+
+class Melt(Task):
+    def execute(self, substrate):
+        substrate.state = "liquid"
+        return True
+
+class TestStorage(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "model.npz")
+
+    def test_substrates_roundtrip(self):
+        substrates = [Substrate("alive" if i % 3 else "dead", f"Cell {i % 2}") for i in range(10)]
+        save_substrates(self.path, substrates)
+        for mmap in (False, True):
+            loaded = load_substrates(self.path, mmap=mmap)
+            self.assertEqual([(s.state, s.name) for s in loaded], [(s.state, s.name) for s in substrates])
+
+        columns = load_columns(self.path, "substrates", mmap=True)
+        self.assertIsInstance(columns["state_codes"], np.memmap)
+        self.assertEqual(len(columns["states"]), 2)
+
+    def test_compressed_cannot_mmap(self):
+        save_substrates(self.path, [Substrate("a", "b")], compressed=True)
+        self.assertEqual(load_substrates(self.path)[0].state, "a")
+        with self.assertRaises(ValueError):
+            load_substrates(self.path, mmap=True)
+
+    def test_wrong_kind(self):
+        save_substrates(self.path, [Substrate("a", "b")])
+        with self.assertRaises(ValueError):
+            load_tasks(self.path)
+
+    def test_tasks_roundtrip(self):
+        hot = Condition("Hot", lambda s: True)
+        tasks = [Task("Melt", [hot], ["solid"]), Task("Any", None), Task("Idle", [])]
+        save_tasks(self.path, tasks)
+        loaded = load_tasks(self.path, {"Hot": hot}, mmap=True)
+        self.assertEqual([t.name for t in loaded], ["Melt", "Any", "Idle"])
+        self.assertEqual([t.conditions for t in loaded], [[hot], None, []])
+        self.assertEqual([t.input_states for t in loaded], [["solid"], None, None])
+        with self.assertRaises(KeyError):
+            load_tasks(self.path)
+
+    def test_tasks_factory(self):
+        save_tasks(self.path, [Melt("Melt", [], ["solid"])])
+        loaded = load_tasks(self.path, factory=Melt)
+        self.assertIsInstance(loaded[0], Melt)
+        self.assertEqual(loaded[0].input_states, ["solid"])
+        substrate = Substrate("solid", "Ice")
+        self.assertTrue(loaded[0].execute(substrate))
+        self.assertEqual(substrate.state, "liquid")
+
+    def test_state_graph_roundtrip(self):
+        task1, task2 = Task("Task 1"), Task("Task 2")
+        substrate = ComplexSubstrate(
+            "A", ["A", "B", "C"], {("A", "B"): task1, ("B", "C"): task2},
+            name="Machine", weights={("A", "B"): 0.5},
+        )
+        substrate.perform_transition(task1)
+        save_state_graph(self.path, substrate)
+        loaded = load_state_graph(self.path, {"Task 1": task1, "Task 2": task2}, mmap=True)
+        self.assertEqual(loaded.current_state, "B")
+        self.assertEqual(loaded.name, "Machine")
+        self.assertEqual(loaded.state_graph["A"]["B"]["weight"], 0.5)
+        self.assertEqual(list(loaded.state_graph.nodes), ["A", "B", "C"])
+        self.assertTrue(loaded.perform_transition(task2))
+
+    def test_state_graph_requires_string_states(self):
+        task = Task("Task")
+        substrate = ComplexSubstrate(0, [0, 1], {(0, 1): task})
+        with self.assertRaises(TypeError):
+            save_state_graph(self.path, substrate)
+
+if __name__ == '__main__':
+    unittest.main()
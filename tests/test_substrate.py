@@ -1,3 +1,4 @@
+import numpy as np
 import unittest
 from constructor.substrate import Substrate, ComplexSubstrate
 from constructor.task import Task
@@ -35,5 +36,65 @@ class TestComplexSubstrate(unittest.TestCase):
         self.assertFalse(self.complex_substrate.perform_transition(self.task1))
         self.assertEqual(self.complex_substrate.current_state, "C")
 
+class TestMarkovComplexSubstrate(unittest.TestCase):
+    def setUp(self):
+        # Gambler's ruin on 0..3 with probability 0.4 of winning each round
+        transitions, weights = {}, {}
+        for i in (1, 2):
+            transitions[(str(i), str(i + 1))] = Task(f"Win {i}")
+            transitions[(str(i), str(i - 1))] = Task(f"Lose {i}")
+            weights[(str(i), str(i + 1))] = 2
+            weights[(str(i), str(i - 1))] = 3
+        self.ruin = ComplexSubstrate("1", ["0", "1", "2", "3"], transitions, weights=weights)
+
+    def test_transition_matrix(self):
+        matrix = self.ruin.transition_matrix().toarray()
+        np.testing.assert_allclose(matrix.sum(axis=1), 1.0)
+        np.testing.assert_allclose(matrix[1], [0.6, 0, 0.4, 0])
+        self.assertEqual(matrix[0, 0], 1.0)
+
+    def test_propagate(self):
+        np.testing.assert_allclose(self.ruin.propagate(steps=1), [0.6, 0, 0.4, 0])
+        np.testing.assert_allclose(self.ruin.propagate(steps=2), [0.6, 0.24, 0, 0.16])
+
+    def test_absorption_probabilities(self):
+        transient, absorbing, probabilities = self.ruin.absorption_probabilities()
+        self.assertEqual((transient, absorbing), (["1", "2"], ["0", "3"]))
+        np.testing.assert_allclose(probabilities[0], [0.6 / 0.76, 0.16 / 0.76])
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+
+    def test_invalid_weights(self):
+        task = Task("Move")
+        with self.assertRaises(ValueError):
+            ComplexSubstrate("A", ["A", "B"], {("A", "B"): task}, weights={("A", "B"): -1})
+        with self.assertRaises(ValueError):
+            ComplexSubstrate("A", ["A", "B"], {("A", "B"): task}, weights={("B", "A"): 1})
+
+    def test_self_loop_is_absorbing(self):
+        task = Task("Move")
+        loop = ComplexSubstrate(
+            "A", ["A", "B", "C"], {("A", "B"): task, ("A", "C"): task, ("C", "C"): task}
+        )
+        transient, absorbing, probabilities = loop.absorption_probabilities()
+        self.assertEqual((transient, absorbing), (["A"], ["B", "C"]))
+        np.testing.assert_allclose(probabilities, [[0.5, 0.5]])
+
+        trapped = ComplexSubstrate(
+            "A", ["A", "B", "C", "D"],
+            {("A", "B"): task, ("A", "C"): task, ("C", "D"): task, ("D", "C"): task},
+        )
+        with self.assertRaises(ValueError):
+            trapped.absorption_probabilities()
+
+    def test_stationary_distribution(self):
+        task = Task("Flip")
+        cycle = ComplexSubstrate(
+            "A", ["A", "B"], {("A", "A"): task, ("A", "B"): task, ("B", "A"): task},
+            weights={("A", "A"): 1, ("A", "B"): 1},
+        )
+        np.testing.assert_allclose(cycle.stationary_distribution(), [2 / 3, 1 / 3])
+        with self.assertRaises(ValueError):
+            self.ruin.stationary_distribution()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
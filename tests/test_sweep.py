@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from constructor.main import Constructor
+from constructor.simulate import Simulation
+from constructor.substrate import ComplexSubstrate, Substrate
+from constructor.sweep import Sweep, final_states
+from constructor.task import Task
+
+calls = []
+
+class SetState(Task):
+    def __init__(self, value):
+        super().__init__("Set State", [])
+        self.value = value
+
+    def execute(self, substrate):
+        substrate.state = self.value
+        return True
+
+class SetStateUpper(SetState):
+    def execute(self, substrate):
+        substrate.state = self.value.upper()
+        return True
+
+task_type = SetState
+
+def build(value, count):
+    calls.append((value, count))
+    task = task_type(value)
+    substrates = [Substrate("initial", f"Substrate {i}") for i in range(count)]
+    return Simulation([Constructor("Constructor", [task])], substrates, [task])
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        calls.clear()
+
+    def test_points(self):
+        sweep = Sweep(build, {"value": ["a", "b"], "count": [1, 2]}, self.cache_dir)
+        self.assertEqual(len(sweep.points()), 4)
+        self.assertEqual(len({sweep.key(p) for p in sweep.points()}), 4)
+
+    @patch('builtins.print')
+    def test_run_caches_results(self, mock_print):
+        sweep = Sweep(build, {"value": ["a", "b"], "count": [1, 2]}, self.cache_dir)
+        results = sweep.run(workers=1)
+        self.assertEqual(results, [["a"], ["a", "a"], ["b"], ["b", "b"]])
+        self.assertEqual(len(calls), 4)
+
+        self.assertEqual(sweep.run(workers=1), results)
+        self.assertEqual(len(calls), 4)
+
+        extended = Sweep(build, {"value": ["a", "b", "c"], "count": [1, 2]}, self.cache_dir)
+        self.assertEqual(len(extended.pending()), 2)
+        self.assertEqual(len(calls), 4)
+        extended.run(workers=1)
+        self.assertEqual(len(calls), 6)
+
+    @patch('builtins.print')
+    def test_final_states_complex_substrate(self, mock_print):
+        task = Task("Advance", [])
+        task.execute = lambda substrate: substrate.perform_transition(task)
+        substrate = ComplexSubstrate("A", ["A", "B"], {("A", "B"): task})
+        simulation = Simulation([Constructor("Constructor", [task])], [substrate], [task])
+        self.assertEqual(final_states(simulation), ["B"])
+
+    def test_version_invalidates(self):
+        sweep = Sweep(build, {"value": ["a"], "count": [1]}, self.cache_dir)
+        other = Sweep(build, {"value": ["a"], "count": [1]}, self.cache_dir, version="2")
+        self.assertNotEqual(sweep.key(sweep.points()[0]), other.key(other.points()[0]))
+
+    def test_configuration_invalidates(self):
+        global task_type
+        sweep = Sweep(build, {"value": ["a"], "count": [1]}, self.cache_dir)
+        key = sweep.key(sweep.points()[0])
+        try:
+            task_type = SetStateUpper
+            other = Sweep(build, {"value": ["a"], "count": [1]}, self.cache_dir)
+            self.assertNotEqual(other.key(other.points()[0]), key)
+        finally:
+            task_type = SetState
+
+    @patch('builtins.print')
+    def test_run_parallel(self, mock_print):
+        sweep = Sweep(build, {"value": ["a", "b"], "count": [2]}, self.cache_dir)
+        self.assertEqual(sweep.run(workers=2), [["a", "a"], ["b", "b"]])
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
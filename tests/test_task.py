@@ -1,8 +1,9 @@
+import asyncio
 import unittest
 from unittest.mock import Mock
 from constructor.task import Task
 from constructor.condition import Condition
-from constructor.substrate import Substrate
+from constructor.substrate import ComplexSubstrate, Substrate
 
 class TestTask(unittest.TestCase):
     def setUp(self):
@@ -36,5 +37,24 @@ class TestTask(unittest.TestCase):
         self.assertFalse(self.task.execute(self.substrate))
         self.assertEqual(self.substrate.state, "input_state")  # Unchanged
 
+class TestTaskWithoutInputStates(unittest.TestCase):
+    def test_is_possible_does_not_read_state(self):
+        condition = Condition("Always", lambda substrate: True)
+        task = Task("Test Task", [condition])
+        substrate = Mock(spec=Substrate)
+
+        self.assertTrue(task.is_possible(substrate))
+        self.assertTrue(asyncio.run(task.ais_possible(substrate)))
+
+class TestTaskComplexSubstrate(unittest.TestCase):
+    def test_is_possible_reads_current_state(self):
+        task = Task("Advance", [], ["A"])
+        substrate = ComplexSubstrate("A", ["A", "B"], {("A", "B"): task})
+
+        self.assertTrue(task.is_possible(substrate))
+        self.assertTrue(asyncio.run(task.ais_possible(substrate)))
+        substrate.perform_transition(task)
+        self.assertFalse(task.is_possible(substrate))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
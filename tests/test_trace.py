@@ -0,0 +1,89 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from constructor import trace
+from constructor.main import Constructor
+from constructor.simulate import Simulation
+from constructor.substrate import ComplexSubstrate, Substrate
+from constructor.task import Task
+from constructor.trace import TraceReader
+
+class SetState(Task):
+    def execute(self, substrate):
+        substrate.state = "done"
+        return True
+
+class Advance(Task):
+    def execute(self, substrate):
+        return substrate.perform_transition(self)
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "trace.bin")
+
+    def test_records_perform_and_transition(self):
+        task = SetState("Set")
+        other = Task("Other")
+        constructor = Constructor("Builder", [task])
+        substrates = [Substrate("new", f"Substrate {i}") for i in range(10)]
+        complex_substrate = ComplexSubstrate("A", ["A", "B"], {("A", "B"): other}, name="Machine")
+
+        constructor.perform(task, substrates[0])  # not recorded
+        with trace.recording(self.path, chunk_size=4):
+            for substrate in substrates:
+                constructor.perform(task, substrate)
+            constructor.perform(other, substrates[0])
+            complex_substrate.perform_transition(other)
+            complex_substrate.perform_transition(other)
+        self.assertIsNone(trace.active())
+
+        reader = TraceReader(self.path)
+        records = reader.read()
+        self.assertEqual(len(records), 13)
+        self.assertEqual(reader.names[records[0]["constructor"]], "Builder")
+        self.assertEqual(reader.names[records[0]["substrate"]], "Substrate 0")
+
+        on_first = reader.read(substrate="Substrate 0")
+        self.assertEqual(on_first["outcome"].tolist(), [1, 0])
+
+        transitions = reader.read(substrate="Machine", task="Other")
+        self.assertEqual(transitions["event"].tolist(), [trace.TRANSITION] * 2)
+        self.assertEqual(transitions["constructor"].tolist(), [-1, -1])
+        self.assertEqual(transitions["outcome"].tolist(), [1, 0])
+
+        self.assertEqual(len(reader.read(substrate="Unknown")), 0)
+
+    @patch('builtins.print')
+    def test_records_from_threads(self, mock_print):
+        task = Advance("Advance", [])
+        constructor = Constructor("Builder", [task])
+        substrates = [
+            ComplexSubstrate("A", ["A", "B"], {("A", "B"): task}, name=f"Machine {i}")
+            for i in range(200)
+        ]
+        simulation = Simulation([constructor], substrates, [task])
+
+        with trace.recording(self.path, chunk_size=7):
+            asyncio.run(simulation.arun(concurrency=50))
+
+        records = TraceReader(self.path).read()
+        self.assertEqual(len(records), 400)
+        self.assertEqual((records["event"] == trace.TRANSITION).sum(), 200)
+        self.assertTrue(records["outcome"].all())
+
+    def test_unnamed_complex_substrates_are_distinct(self):
+        task = Advance("Advance", [])
+        first = ComplexSubstrate("A", ["A", "B"], {("A", "B"): task})
+        second = ComplexSubstrate("A", ["A", "B"], {("A", "B"): task})
+        self.assertNotEqual(first.name, second.name)
+
+        with trace.recording(self.path):
+            first.perform_transition(task)
+            second.perform_transition(task)
+
+        self.assertEqual(len(TraceReader(self.path).read(substrate=first.name)), 1)
+
+if __name__ == '__main__':
+    unittest.main()